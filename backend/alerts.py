@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import BulkWriteError
+
+from geo_index import grid_cell, grid_cells_within, haversine_km, has_coordinates
+from search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Alerts carry enough of the item to be delivered without another lookup.
+ALERT_ITEM_FIELDS = ("id", "type", "title", "category", "color", "location", "created_at")
+
+# pending: stored, not yet handed to the outbox; unread: notification queued; read: seen by the user
+PENDING, UNREAD, READ = "pending", "unread", "read"
+
+
+def _color(value):
+    return (value or "").strip().lower() or None
+
+
+def item_terms(item):
+    return set(tokenize(" ".join(filter(None, (
+        item.get("title"), item.get("description"), item.get("location"), item.get("color"))))))
+
+
+def has_criteria(search):
+    """True when a saved search narrows the items it matches; one that doesn't would match everything."""
+    return bool(search.get("type") or search.get("category") or _color(search.get("color"))
+                or tokenize(search.get("keywords")) or search.get("radius_km"))
+
+
+class StandingQuery:
+    __slots__ = ("id", "user_id", "type", "category", "color", "terms", "latitude", "longitude", "radius_km")
+
+    def __init__(self, search):
+        self.id = search["id"]
+        self.user_id = search["user_id"]
+        self.type = search.get("type") or None
+        self.category = search.get("category") or None
+        self.color = _color(search.get("color"))
+        self.terms = frozenset(tokenize(search.get("keywords")))
+        self.radius_km = search.get("radius_km") or None
+        self.latitude = search.get("latitude")
+        self.longitude = search.get("longitude")
+
+    def matches(self, item, terms):
+        if self.type and item.get("type") != self.type:
+            return False
+        if self.category and item.get("category") != self.category:
+            return False
+        if self.color and _color(item.get("color")) != self.color:
+            return False
+        if not self.terms <= terms:
+            return False
+        if self.radius_km:
+            if not has_coordinates(item):
+                return False
+            distance = haversine_km(self.latitude, self.longitude, item["latitude"], item["longitude"])
+            if distance > self.radius_km:
+                return False
+        return True
+
+
+class SavedSearchIndex:
+    """Percolator: an inverted index of saved searches, queried with each new item.
+
+    Every search is filed under the keys of its most selective required condition (a
+    keyword, category + color, the grid cells its radius covers, ...). An item only
+    looks up the buckets for its own keys and verifies those candidates, so the cost
+    per item depends on how many searches could match it, not on how many exist.
+    """
+
+    def __init__(self, cell_deg=0.1):
+        self.cell_deg = cell_deg
+        self.queries = {}                 # search id -> StandingQuery
+        self.anchors = {}                 # search id -> keys it is filed under
+        self.buckets = defaultdict(set)   # key -> search ids
+
+    def __len__(self):
+        return len(self.queries)
+
+    def _anchor_keys(self, query):
+        if query.terms:
+            # Longer words are usually rarer, so they make the smaller bucket.
+            return [("term", max(query.terms, key=lambda term: (len(term), term)))]
+        if query.category and query.color:
+            return [("category_color", query.category, query.color)]
+        if query.radius_km:
+            cells = grid_cells_within(query.latitude, query.longitude, query.radius_km, self.cell_deg)
+            return [("cell",) + cell for cell in set(cells)]
+        if query.color:
+            return [("color", query.color)]
+        if query.category:
+            return [("category", query.category)]
+        if query.type:
+            return [("type", query.type)]
+        return [("any",)]
+
+    def _item_keys(self, item, terms):
+        category, color = item.get("category"), _color(item.get("color"))
+        keys = [("term", term) for term in terms]
+        keys += [("category_color", category, color), ("color", color), ("category", category),
+                 ("type", item.get("type")), ("any",)]
+        if has_coordinates(item):
+            keys.append(("cell",) + grid_cell(item["latitude"], item["longitude"], self.cell_deg))
+        return keys
+
+    def add(self, search):
+        self.remove(search["id"])
+        if not has_criteria(search):
+            return   # stored before keywords were validated; never alert on every item
+        query = StandingQuery(search)
+        keys = self._anchor_keys(query)
+        self.queries[query.id] = query
+        self.anchors[query.id] = keys
+        for key in keys:
+            self.buckets[key].add(query.id)
+
+    def remove(self, search_id):
+        if self.queries.pop(search_id, None) is None:
+            return
+        for key in self.anchors.pop(search_id):
+            bucket = self.buckets[key]
+            bucket.discard(search_id)
+            if not bucket:
+                del self.buckets[key]
+
+    def clear(self):
+        self.queries.clear()
+        self.anchors.clear()
+        self.buckets.clear()
+
+    def match(self, item):
+        """Saved searches satisfied by ``item``."""
+        terms = item_terms(item)
+        candidates = set()
+        for key in self._item_keys(item, terms):
+            candidates.update(self.buckets.get(key, ()))
+        return [self.queries[search_id] for search_id in candidates
+                if self.queries[search_id].matches(item, terms)]
+
+
+class AlertMatcher:
+    """Background worker that percolates new items and notifies the owner of each matching search.
+
+    Alerts are stored as pending, handed to the outbox as one email each and then become
+    unread. A periodic sweep re-sends alerts a crash or failed hand-off left pending; the
+    outbox dedup key stops that from sending anything twice.
+    """
+
+    def __init__(self, index, outbox, batch_size=64, sweep_seconds=60.0):
+        self.index = index
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.sweep_seconds = sweep_seconds
+        self.queue = asyncio.Queue()
+        self.db = None
+        self.queued = 0
+        self.notified = 0
+        self._tasks = []
+
+    def start(self, db):
+        self.db = db
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._sweep_loop())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def submit(self, item):
+        self.queue.put_nowait(item)
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self.process(batch)
+            except Exception:
+                logger.exception("Alert matching failed for %d items", len(batch))
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Alert sweep failed")
+
+    async def process(self, items):
+        now = datetime.now(timezone.utc)
+        alerts = []
+        for item in items:
+            for query in self.index.match(item):
+                if query.user_id == item.get("user_id"):
+                    continue   # nobody needs an alert about their own post
+                alerts.append({
+                    "id": str(uuid.uuid4()),
+                    "user_id": query.user_id,
+                    "saved_search_id": query.id,
+                    "item_id": item["id"],
+                    "item": {field: item.get(field) for field in ALERT_ITEM_FIELDS},
+                    "status": PENDING,
+                    "created_at": now,
+                })
+        if not alerts:
+            return 0
+        try:
+            await self.db.alerts.insert_many(alerts, ordered=False)
+            inserted = alerts
+        except BulkWriteError as exc:
+            # The unique (saved_search_id, item_id) index drops repeats of the same match.
+            rejected = {error["index"] for error in exc.details.get("writeErrors", ())}
+            inserted = [alert for position, alert in enumerate(alerts) if position not in rejected]
+        self.queued += len(inserted)
+        await self.notify(inserted)
+        return len(inserted)
+
+    async def notify(self, alerts):
+        """Queue an email per alert through the outbox and mark the alerts unread."""
+        if not alerts:
+            return 0
+        user_ids = list({alert["user_id"] for alert in alerts})
+        users = {user["id"]: user for user in await self.db.users.find(
+            {"id": {"$in": user_ids}}, {"_id": 0, "id": 1, "email": 1}).to_list(len(user_ids))}
+        for alert in alerts:
+            user = users.get(alert["user_id"])
+            if user is None:
+                continue   # the account is gone; the alert just stays in the list
+            item = alert["item"]
+            await self.outbox.enqueue(
+                self.db, "saved_search_alert", user["email"],
+                subject=f"New {item.get('type')} item matches your saved search: {item.get('title')}",
+                body="\n".join(f"{label}: {item[field]}" for field, label in (
+                    ("title", "Item"), ("category", "Category"), ("color", "Color"), ("location", "Location"))
+                    if item.get(field)),
+                dedup_key=f"alert:{alert['id']}",
+            )
+        await self.db.alerts.update_many(
+            {"id": {"$in": [alert["id"] for alert in alerts]}, "status": PENDING},
+            {"$set": {"status": UNREAD, "notified_at": datetime.now(timezone.utc)}},
+        )
+        self.notified += len(alerts)
+        return len(alerts)
+
+    async def sweep(self):
+        """Notify alerts still pending after a full sweep interval."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.sweep_seconds)
+        stale = await self.db.alerts.find(
+            {"status": PENDING, "created_at": {"$lt": cutoff}}, {"_id": 0}
+        ).sort("created_at", 1).to_list(self.batch_size * 4)
+        if stale:
+            logger.info("Notifying %d alerts left pending", len(stale))
+        return await self.notify(stale)
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLLECTION = "items_archive"
+EXPIRED = "expired"
+
+
+class ItemArchiver:
+    """Lifecycle policy for items, applied in batches from a background task.
+
+    Active items older than ``max_active_days`` are marked expired. Items that have
+    been out of the active state for ``archive_after_days`` move to the archive
+    collection, keeping ``items`` limited to the working set the listings read.
+    """
+
+    def __init__(self, max_active_days=90.0, archive_after_days=7.0, batch_size=500,
+                 interval_seconds=600.0, batch_pause_seconds=0.05, on_expired=None):
+        self.max_active_days = max_active_days          # 0 disables auto-expiry
+        self.archive_after_days = archive_after_days
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.batch_pause_seconds = batch_pause_seconds
+        self.on_expired = on_expired                    # awaited with each batch of expired items
+        self.expired = 0
+        self.archived = 0
+        self.last_run_at = None
+        self.last_run_seconds = None
+        self._task = None
+
+    async def find(self, db, item_id, projection=None):
+        return await db[ARCHIVE_COLLECTION].find_one({"id": item_id}, projection)
+
+    async def restore(self, db, item_id, user_id, now=None):
+        """Move an owner's archived item back to ``items`` as active; returns the archived document."""
+        doc = await db[ARCHIVE_COLLECTION].find_one({"id": item_id, "user_id": user_id}, {"_id": 0})
+        if doc is None:
+            return None
+        now = now or datetime.now(timezone.utc)
+        restored = {key: value for key, value in doc.items() if key != "archived_at"}
+        # Copy first, then delete, as when archiving.
+        await db.items.replace_one({"id": item_id},
+                                   {**restored, "status": "active", "status_changed_at": now,
+                                    "previous_status": restored.get("status")}, upsert=True)
+        await db[ARCHIVE_COLLECTION].delete_one({"id": item_id})
+        return restored
+
+    async def expire_stale(self, db, now=None):
+        if not self.max_active_days:
+            return 0
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=self.max_active_days)
+        # Age counts from the last activation, so an owner can bring an old post back.
+        stale = {
+            "status": "active",
+            "created_at": {"$lt": cutoff},
+            "$or": [{"status_changed_at": {"$lt": cutoff}}, {"status_changed_at": {"$exists": False}}],
+        }
+        total = 0
+        while True:
+            items = await db.items.find(stale, {"_id": 0}).sort("created_at", 1).limit(self.batch_size).to_list(self.batch_size)
+            if not items:
+                break
+            ids = [item["id"] for item in items]
+            result = await db.items.update_many(
+                {"id": {"$in": ids}, **stale},
+                {"$set": {"status": EXPIRED, "status_changed_at": now, "previous_status": "active"}},
+            )
+            if result.modified_count < len(ids):
+                # Some owners changed status between the read and the update; keep only ours.
+                ours = {doc["id"] async for doc in db.items.find(
+                    {"id": {"$in": ids}, "status": EXPIRED, "status_changed_at": now}, {"_id": 0, "id": 1})}
+                items = [item for item in items if item["id"] in ours]
+            if items and self.on_expired:
+                await self.on_expired(items)
+            total += len(items)
+            if len(ids) < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause_seconds)
+        self.expired += total
+        return total
+
+    async def archive_inactive(self, db, now=None):
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=self.archive_after_days)
+        query = {
+            "status": {"$ne": "active"},
+            "$or": [{"status_changed_at": {"$lt": cutoff}}, {"status_changed_at": {"$exists": False}}],
+        }
+        total = 0
+        while True:
+            docs = await db.items.find(query, {"_id": 0}).limit(self.batch_size).to_list(self.batch_size)
+            if not docs:
+                break
+            ids = [doc["id"] for doc in docs]
+            # Copy first, then delete: a crash in between leaves a duplicate that the
+            # next run overwrites, never a lost item.
+            await db[ARCHIVE_COLLECTION].bulk_write(
+                [ReplaceOne({"id": doc["id"]}, {**doc, "archived_at": now}, upsert=True) for doc in docs],
+                ordered=False,
+            )
+            result = await db.items.delete_many({"id": {"$in": ids}, "status": {"$ne": "active"}})
+            kept = set()
+            if result.deleted_count < len(ids):
+                # Reactivated meanwhile: the hot copy wins, drop the archived one.
+                kept = {doc["id"] async for doc in db.items.find({"id": {"$in": ids}}, {"_id": 0, "id": 1})}
+                if kept:
+                    await db[ARCHIVE_COLLECTION].delete_many({"id": {"$in": list(kept)}})
+            archived = [item_id for item_id in ids if item_id not in kept]
+            if archived:
+                await db.matches.delete_many({"item_id": {"$in": archived}})
+            total += result.deleted_count
+            if len(docs) < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause_seconds)
+        self.archived += total
+        return total
+
+    async def run_once(self, db):
+        started = datetime.now(timezone.utc)
+        expired = await self.expire_stale(db, started)
+        archived = await self.archive_inactive(db, started)
+        self.last_run_at = started
+        self.last_run_seconds = round((datetime.now(timezone.utc) - started).total_seconds(), 3)
+        if expired or archived:
+            logger.info("Item lifecycle: %d expired, %d archived in %.3fs", expired, archived, self.last_run_seconds)
+        return expired, archived
+
+    def start(self, db):
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once(db)
+            except Exception:
+                logger.exception("Item lifecycle run failed")
+
+    def stats(self):
+        return {
+            "max_active_days": self.max_active_days,
+            "archive_after_days": self.archive_after_days,
+            "batch_size": self.batch_size,
+            "expired": self.expired,
+            "archived": self.archived,
+            "last_run_at": self.last_run_at,
+            "last_run_seconds": self.last_run_seconds,
+        }
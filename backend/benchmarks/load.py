@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Local load test for the Found & Loss API.
+
+Boots server.py under uvicorn in a separate process, seeds users and items through
+the public API (register + /api/items/bulk), then drives a
+weighted mix of login / list / detail / create / status-update requests from many
+concurrent async clients. Reports RPS and p50/p95/p99 per route and saves a JSON
+result that later runs can be compared against.
+
+Run from the backend directory:
+
+    python benchmarks/load.py --in-memory --duration 20 --concurrency 50
+    python benchmarks/load.py --mongo-url mongodb://localhost:27017 --items 20000
+    python benchmarks/load.py --in-memory --compare benchmarks/results/<previous>.json
+
+--in-memory uses mongomock-motor (pip install mongomock-motor) in place of MongoDB.
+The load generator shares no event loop or CPU time slice with the server process.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+PASSWORD = "BenchPass123!"
+
+CATEGORIES = ["Electronics", "Jewelry", "Clothing", "Bags & Wallets", "Keys", "Documents", "Books",
+              "Toys", "Sports Equipment", "Accessories", "Glasses/Sunglasses", "Watches", "Other"]
+COLORS = ["Black", "White", "Silver", "Blue", "Red", "Brown", "Green", "Gold", "Pink", "Grey"]
+NOUNS = ["iPhone", "wallet", "backpack", "keys", "watch", "laptop", "umbrella", "jacket", "passport",
+         "earbuds", "ring", "sunglasses", "water bottle", "notebook", "scarf"]
+PLACES = ["Central Station", "Main Street Cafe", "City Library", "Riverside Park", "Stadium Gate 4",
+          "University Campus", "Bus 42", "Airport Terminal B", "Shopping Mall", "Museum Lobby"]
+
+MIX = {"login": 1, "list": 10, "list_filtered": 4, "detail": 6, "create": 2, "status": 1}
+
+
+# ------------------ DATA ------------------
+def fake_item(rng):
+    noun, color, place = rng.choice(NOUNS), rng.choice(COLORS), rng.choice(PLACES)
+    return {
+        "type": rng.choice(["lost", "found"]),
+        "title": f"{color} {noun}",
+        "description": f"{color} {noun} last seen around {place}. Has a small scratch and a sticker.",
+        "category": rng.choice(CATEGORIES),
+        "color": color,
+        "location": place,
+        "latitude": 40.70 + rng.random() * 0.1,
+        "longitude": -74.02 + rng.random() * 0.1,
+        "contact_email": f"user{rng.randrange(10**6)}@example.com",
+        "contact_phone": "+1-555-0100",
+    }
+
+
+async def seed(client, users, items, rng):
+    run_id = f"{int(time.time())}{rng.randrange(1000):03d}"
+    emails = [f"bench{run_id}_{i}@example.com" for i in range(users)]
+    slots = asyncio.Semaphore(8)
+
+    async def register(email):
+        async with slots:
+            response = await client.post("/api/auth/register", json={
+                "email": email, "password": PASSWORD, "full_name": "Bench User", "phone": "+1-555-0100"})
+            response.raise_for_status()
+            return response.json()["access_token"]
+
+    tokens = await asyncio.gather(*[register(email) for email in emails])
+
+    item_ids = []
+    for start in range(0, items, 500):
+        rows = [fake_item(rng) for _ in range(min(500, items - start))]
+        response = await client.post("/api/items/bulk", json=rows,
+                                     headers={"Authorization": f"Bearer {rng.choice(tokens)}"})
+        response.raise_for_status()
+        item_ids.extend(r["id"] for r in response.json()["results"] if r["ok"])
+    return emails, item_ids
+
+
+# ------------------ LOAD ------------------
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route, seconds, status):
+        self.latencies[route].append(seconds)
+        self.statuses[route][status] += 1
+        if status >= 400:
+            self.errors[route] += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+async def worker(client, rng, emails, item_ids, deadline, recorder, measuring):
+    token = None
+    my_items = []
+    routes, weights = zip(*MIX.items())
+
+    async def call(route, method, url, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        if measuring():
+            recorder.record(route, time.perf_counter() - started, response.status_code)
+        return response
+
+    while time.perf_counter() < deadline:
+        route = rng.choices(routes, weights)[0]
+        if route in ("create", "status") and token is None:
+            route = "login"
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+        if route == "login":
+            response = await call(route, "POST", "/api/auth/login",
+                                  json={"email": rng.choice(emails), "password": PASSWORD})
+            if response.status_code == 200:
+                # Items created under the previous account can no longer be updated.
+                token = response.json()["access_token"]
+                my_items = []
+        elif route == "list":
+            await call(route, "GET", "/api/items", params={"limit": 20})
+        elif route == "list_filtered":
+            await call(route, "GET", "/api/items", params={
+                "type": rng.choice(["lost", "found"]), "category": rng.choice(CATEGORIES), "limit": 20})
+        elif route == "detail":
+            await call(route, "GET", f"/api/items/{rng.choice(item_ids)}")
+        elif route == "create":
+            response = await call(route, "POST", "/api/items", json=fake_item(rng), headers=headers)
+            if response.status_code == 200:
+                my_items.append(response.json()["id"])
+        elif route == "status":
+            if not my_items:
+                continue
+            await call(route, "PUT", f"/api/items/{my_items.pop()}/status",
+                       params={"status": "resolved"}, headers=headers)
+
+
+async def drive(base_url, args, emails, item_ids):
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        measuring = lambda: time.perf_counter() >= measure_from  # noqa: E731
+        await asyncio.gather(*[
+            worker(client, random.Random(rng.random()), emails, item_ids, deadline, recorder, measuring)
+            for _ in range(args.concurrency)
+        ])
+    return recorder
+
+
+def summarize(recorder, duration):
+    routes = {}
+    for route, values in sorted(recorder.latencies.items()):
+        values.sort()
+        routes[route] = {
+            "requests": len(values),
+            "rps": round(len(values) / duration, 2),
+            "errors": recorder.errors[route],
+            "statuses": {str(k): v for k, v in sorted(recorder.statuses[route].items())},
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+    total = sum(r["requests"] for r in routes.values())
+    return {"total_requests": total, "total_rps": round(total / duration, 2), "routes": routes}
+
+
+def print_summary(summary, baseline=None, threshold=10.0):
+    print(f"\n{'route':<15}{'reqs':>8}{'rps':>10}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    regressions = []
+    for route, r in summary["routes"].items():
+        line = f"{route:<15}{r['requests']:>8}{r['rps']:>10.1f}{r['errors']:>6}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        base = (baseline or {}).get("routes", {}).get(route)
+        if base and base["p95_ms"]:
+            delta = 100 * (r["p95_ms"] - base["p95_ms"]) / base["p95_ms"]
+            line += f"   p95 {delta:+.1f}%"
+            if delta > threshold:
+                regressions.append((route, delta))
+                line += "  <-- regression"
+        print(line)
+    print(f"\ntotal: {summary['total_requests']} requests, {summary['total_rps']:.1f} rps")
+    return regressions
+
+
+# ------------------ SERVER ------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def serve(args):
+    """Entry point of the server subprocess."""
+    import server
+
+    if args.in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--in-memory needs mongomock-motor: pip install mongomock-motor")
+        server.AsyncIOMotorClient = AsyncMongoMockClient
+    uvicorn.run(server.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+async def wait_until_healthy(base_url, process, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                sys.exit(f"server exited with code {process.returncode}")
+            try:
+                if (await client.get("/api/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    sys.exit("server did not become healthy in time")
+
+
+async def run(args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "DB_NAME": args.db_name, "MONGO_URL": args.mongo_url or "mongodb://localhost:27017"}
+    # Every simulated client shares one address, so per-client limits would only measure 429s.
+    env.setdefault("RATE_LIMITS", "0")
+    command = [sys.executable, __file__, "--serve", "--port", str(port)] + (["--in-memory"] if args.in_memory else [])
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+    try:
+        await wait_until_healthy(base_url, process)
+        print(f"Seeding {args.users} users and {args.items} items...")
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            emails, item_ids = await seed(client, args.users, args.items, random.Random(args.seed))
+        print(f"Driving load: {args.concurrency} clients, {args.warmup}s warm-up + {args.duration}s measured")
+        recorder = await drive(base_url, args, emails, item_ids)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        if not args.keep_data and not args.in_memory:
+            from pymongo import MongoClient
+            MongoClient(args.mongo_url).drop_database(args.db_name)
+
+    return summarize(recorder, args.duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", help="MongoDB to run against (a scratch database is created)")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MongoDB")
+    parser.add_argument("--db-name", default="foundloss_bench")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare p95 latencies against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p95 regression threshold in percent")
+    parser.add_argument("--keep-data", action="store_true", help="do not drop the scratch database")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        return serve(args)
+    if not args.in_memory and not args.mongo_url:
+        parser.error("pass --mongo-url or --in-memory")
+
+    summary = asyncio.run(run(args))
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "backend": "mongomock" if args.in_memory else "mongodb",
+        "config": {k: getattr(args, k) for k in ("users", "items", "concurrency", "duration", "warmup", "seed")},
+        "mix": MIX,
+        **summary,
+    }
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    regressions = print_summary(result, baseline, args.threshold)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"📄 Results saved to: {output}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Per-item cost of the item list read path, before and after the lean serializer.
+
+"model" reproduces the old path: Item(**doc) per row, FastAPI's response_model
+validation of List[Item], jsonable_encoder and json.dumps.
+"lean" is the current path: projected documents serialized straight to bytes.
+
+Run from the backend directory:  python benchmarks/serialization.py [rows] [repeats]
+"""
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from server import ITEM_PROJECTION, Item, lean_item, render_json  # noqa: E402
+
+
+def make_docs(rows):
+    now = datetime.utcnow().replace(microsecond=0)
+    docs = []
+    for i in range(rows):
+        docs.append({
+            "_id": uuid.uuid4().hex[:24],
+            "id": str(uuid.uuid4()),
+            "user_id": str(uuid.uuid4()),
+            "type": "found" if i % 2 else "lost",
+            "title": f"Black iPhone 13 with blue case #{i}",
+            "description": "Found near the coffee shop on Main Street. Has a blue case and a screen protector.",
+            "category": "Electronics",
+            "color": "Black",
+            "location": "Main Street Coffee Shop, Downtown",
+            "latitude": 40.7128 + i * 1e-4,
+            "longitude": -74.0060,
+            "contact_email": "finder@example.com",
+            "contact_phone": "+1-555-0123",
+            "image_url": None,
+            "status": "active",
+            "created_at": now - timedelta(minutes=i),
+        })
+    return docs
+
+
+def model_path(docs, adapter):
+    items = [Item(**doc) for doc in docs]
+    validated = adapter.validate_python(items, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def lean_path(docs):
+    return render_json([lean_item(doc) for doc in docs])
+
+
+def measure(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    adapter = TypeAdapter(List[Item])
+
+    raw_docs = make_docs(rows)
+    # The lean path reads with ITEM_PROJECTION, so it never sees _id.
+    projected = [{k: v for k, v in doc.items() if k in ITEM_PROJECTION and k != "_id"} for doc in raw_docs]
+
+    model_s = measure(lambda: model_path(raw_docs, adapter), repeats)
+    lean_s = measure(lambda: lean_path(projected), repeats)
+
+    print(f"rows={rows} repeats={repeats} (best of)")
+    print(f"  model path: {model_s * 1e6 / rows:8.2f} us/item  {model_s * 1e3:8.3f} ms/page")
+    print(f"  lean path:  {lean_s * 1e6 / rows:8.2f} us/item  {lean_s * 1e3:8.3f} ms/page")
+    print(f"  speedup:    {model_s / lean_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (self.clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        return {"size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses}
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+
+
+class ResponseCache:
+    """Tag-invalidated cache of serialized responses with single-flight loading.
+
+    Concurrent misses for the same key share one loader call. Results computed while
+    an invalidation happened are returned to the waiting callers but never stored.
+    """
+
+    def __init__(self, maxsize=2048, ttl=30.0):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.tags = {}        # tag -> set of keys
+        self.generation = 0
+        self.coalesced = 0
+        self._tagged = 0
+        self._inflight = {}   # key -> asyncio.Future
+
+    async def get_or_load(self, key, tags, loader):
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self.generation
+        try:
+            body = await loader()
+            entry = CachedResponse(body, '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest())
+            if generation == self.generation:
+                self.entries.set(key, entry)
+                for tag in tags:
+                    self.tags.setdefault(tag, set()).add(key)
+                self._tagged += len(tags)
+                if self._tagged > 4 * self.entries.maxsize:
+                    self._prune_tags()
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure does not log "exception never retrieved".
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _prune_tags(self):
+        # Entries also leave through TTL expiry and LRU eviction; drop their stale tag links.
+        live = self.entries._data
+        for tag in list(self.tags):
+            keys = {key for key in self.tags[tag] if key in live}
+            if keys:
+                self.tags[tag] = keys
+            else:
+                del self.tags[tag]
+        self._tagged = sum(len(keys) for keys in self.tags.values())
+
+    def invalidate(self, *tags):
+        self.generation += 1
+        for tag in tags:
+            for key in self.tags.pop(tag, ()):
+                self.entries.pop(key)
+
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+        self.tags.clear()
+        self._tagged = 0
+
+    def stats(self):
+        return dict(self.entries.stats(), coalesced=self.coalesced, tags=len(self.tags))
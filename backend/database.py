@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, monitoring
+
+logger = logging.getLogger(__name__)
+
+# ------------------ INDEX REGISTRY ------------------
+# Every query shape the API issues should be covered here; ensure_indexes() runs at startup.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+    ],
+    "items": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                   name="user_created"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                   name="status_created"),
+        IndexModel([("status", ASCENDING), ("type", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                   name="status_type_created"),
+        IndexModel([("status", ASCENDING), ("category", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                   name="status_category_created"),
+        IndexModel([("status", ASCENDING), ("type", ASCENDING), ("category", ASCENDING),
+                    ("created_at", DESCENDING), ("id", DESCENDING)],
+                   name="status_type_category_created"),
+        IndexModel([("status", ASCENDING), ("type", ASCENDING), ("color", ASCENDING), ("created_at", DESCENDING)],
+                   name="status_type_color_created"),
+        IndexModel([("status", ASCENDING), ("status_changed_at", ASCENDING)], name="status_changed"),
+        # Incremental index refreshes read items by status_changed_at across all statuses.
+        IndexModel([("status_changed_at", ASCENDING)], name="changed_at"),
+        IndexModel([("status", ASCENDING), ("view_count", DESCENDING), ("created_at", DESCENDING)],
+                   name="status_views"),
+        # Exports across every status (status=all) walk this instead of sorting in memory.
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_id"),
+    ],
+    "items_archive": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                   name="user_created"),
+    ],
+    "matches": [
+        IndexModel([("item_id", ASCENDING)], unique=True, name="item_id_unique"),
+    ],
+    "saved_searches": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    ],
+    "alerts": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+        IndexModel([("saved_search_id", ASCENDING), ("item_id", ASCENDING)], unique=True, name="search_item_unique"),
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created"),
+    ],
+    "outbox": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("dedup_key", ASCENDING)], unique=True, name="dedup_key_unique"),
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt"),
+        IndexModel([("claim", ASCENDING)], sparse=True, name="claim"),
+    ],
+}
+
+
+async def ensure_indexes(db, registry=None):
+    for collection, indexes in (registry or INDEXES).items():
+        names = await db[collection].create_indexes(indexes)
+        logger.info("Ensured indexes on %s: %s", collection, ", ".join(names))
+
+
+# ------------------ SLOW QUERY MONITOR ------------------
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "delete", "update", "findAndModify"}
+EXPLAIN_KEYS = {"find", "filter", "sort", "projection", "limit", "skip", "hint",
+                "aggregate", "pipeline", "cursor", "count", "query", "distinct", "key",
+                "updates", "deletes", "update", "remove", "new", "upsert", "fields"}
+# Explain accepts a write command with a single statement only.
+WRITE_BATCHES = ("updates", "deletes")
+
+
+def query_shape(value):
+    """Replace literal values with '?' so logged queries never carry user data."""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [query_shape(v) for v in value[:3]]
+    return "?"
+
+
+def plan_summary(explain):
+    stages = []
+
+    def walk(stage):
+        if not isinstance(stage, dict):
+            return
+        name = stage.get("stage")
+        if name in ("COLLSCAN", "IXSCAN", "IDHACK", "COUNT_SCAN", "DISTINCT_SCAN"):
+            stages.append(f"{name}({stage['indexName']})" if stage.get("indexName") else name)
+        walk(stage.get("inputStage"))
+        for child in stage.get("inputStages", ()):
+            walk(child)
+        walk(stage.get("queryPlan"))
+
+    planner = explain.get("queryPlanner") or explain.get("stages", [{}])[0].get("$cursor", {}).get("queryPlanner", {})
+    walk(planner.get("winningPlan"))
+    return " > ".join(stages) or "UNKNOWN"
+
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """Records commands slower than ``threshold_ms`` together with their query plan."""
+
+    def __init__(self, threshold_ms=100.0, keep=200):
+        self.threshold_ms = threshold_ms
+        self.entries = deque(maxlen=keep)
+        self._pending = {}
+        self._db = None
+        self._loop = None
+
+    def attach(self, db, loop):
+        self._db = db
+        self._loop = loop
+
+    def started(self, event):
+        if event.command_name in EXPLAINABLE:
+            command = {k: v for k, v in event.command.items() if k in EXPLAIN_KEYS or k == event.command_name}
+            for batch in WRITE_BATCHES:
+                if batch in command:
+                    command[batch] = command[batch][:1]
+            self._pending[(event.connection_id, event.request_id)] = command
+
+    def succeeded(self, event):
+        self._finish(event, ok=True)
+
+    def failed(self, event):
+        self._finish(event, ok=False)
+
+    def _finish(self, event, ok):
+        command = self._pending.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        entry = {
+            "command": event.command_name,
+            "database": event.database_name,
+            "collection": command.get(event.command_name) if command else None,
+            "shape": query_shape({k: v for k, v in (command or {}).items() if k != event.command_name}),
+            "duration_ms": round(duration_ms, 2),
+            "ok": ok,
+            "plan": None,
+            "at": time.time(),
+        }
+        self.entries.append(entry)
+        logger.warning("Slow query %s.%s took %.1fms shape=%s",
+                       entry["database"], entry["collection"], duration_ms, entry["shape"])
+
+        if command and self._db is not None and self._loop is not None and not self._loop.is_closed():
+            # Listeners run on the driver's thread; hop back onto the loop to explain.
+            asyncio.run_coroutine_threadsafe(self._explain(entry, command), self._loop)
+
+    async def _explain(self, entry, command):
+        try:
+            explain = await self._db.command({"explain": command, "verbosity": "queryPlanner"})
+        except Exception as exc:
+            entry["plan"] = f"explain failed: {exc}"
+            return
+        entry["plan"] = plan_summary(explain)
+        if "COLLSCAN" in entry["plan"]:
+            logger.warning("Slow query on %s used a collection scan: %s", entry["collection"], entry["shape"])
+
+    def snapshot(self):
+        return sorted(self.entries, key=lambda e: e["duration_ms"], reverse=True)
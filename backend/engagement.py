@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+VIEWS = "view_count"
+CONTACTS = "contact_count"
+
+
+class EngagementCounters:
+    """Write-behind per-item counters.
+
+    Increments are summed in memory and written every ``flush_seconds`` as a single
+    unordered ``bulk_write`` of ``$inc`` updates, so a hot item costs one write per
+    interval instead of one per request. Reaching ``max_items`` distinct items triggers
+    an early flush; past twice that, increments are dropped rather than letting memory grow.
+    """
+
+    def __init__(self, collection="items", flush_seconds=5.0, max_items=10_000):
+        self.collection = collection
+        self.flush_seconds = flush_seconds
+        self.max_items = max_items
+        self.pending = defaultdict(lambda: defaultdict(int))   # item_id -> field -> increment
+        self.flushes = 0
+        self.flushed_updates = 0
+        self.dropped = 0
+        self.db = None
+        self._wake = None
+        self._task = None
+
+    def incr(self, item_id, field, amount=1):
+        if item_id not in self.pending:
+            if len(self.pending) >= 2 * self.max_items:
+                self.dropped += amount
+                return
+            if len(self.pending) >= self.max_items and self._wake is not None:
+                self._wake.set()
+        self.pending[item_id][field] += amount
+
+    async def flush(self):
+        if not self.pending or self.db is None:
+            return 0
+        batch, self.pending = self.pending, defaultdict(lambda: defaultdict(int))
+        ops = [UpdateOne({"id": item_id}, {"$inc": dict(fields)}) for item_id, fields in batch.items()]
+        try:
+            await self.db[self.collection].bulk_write(ops, ordered=False)
+        except Exception:
+            # Put the increments back for the next attempt, within the same memory bound.
+            for item_id, fields in batch.items():
+                for field, amount in fields.items():
+                    self.incr(item_id, field, amount)
+            raise
+        self.flushes += 1
+        self.flushed_updates += len(ops)
+        return len(ops)
+
+    def start(self, db):
+        self.db = db
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final engagement counter flush failed; %d items lost", len(self.pending))
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Engagement counter flush failed")
+
+    def stats(self):
+        return {
+            "pending_items": len(self.pending),
+            "max_items": self.max_items,
+            "flushes": self.flushes,
+            "flushed_updates": self.flushed_updates,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,63 @@
+import asyncio
+from collections import defaultdict
+
+
+class Subscriber:
+    __slots__ = ("key", "queue", "dropped", "lagged")
+
+    def __init__(self, key, queue_size):
+        self.key = key
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.lagged = False
+
+    def offer(self, event):
+        # Slow consumer: discard the oldest pending event rather than block the publisher,
+        # and flag the subscriber so it can tell its client to resync.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.lagged = True
+        self.queue.put_nowait(event)
+
+
+class FeedHub:
+    """In-process fan-out of item events to subscribers filtered by type and category."""
+
+    def __init__(self, queue_size=100, max_subscribers=10000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers = defaultdict(set)   # (type, category) -> subscribers
+        self.count = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, type=None, category=None):
+        if self.count >= self.max_subscribers:
+            return None
+        subscriber = Subscriber((type or None, category or None), self.queue_size)
+        self.subscribers[subscriber.key].add(subscriber)
+        self.count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        members = self.subscribers.get(subscriber.key)
+        if members and subscriber in members:
+            members.discard(subscriber)
+            self.count -= 1
+            self.dropped += subscriber.dropped
+            if not members:
+                del self.subscribers[subscriber.key]
+
+    def publish(self, event, type, category):
+        self.published += 1
+        for key in {(None, None), (type, None), (None, category), (type, category)}:
+            for subscriber in self.subscribers.get(key, ()):
+                subscriber.offer(event)
+
+    def stats(self):
+        return {
+            "subscribers": self.count,
+            "published": self.published,
+            "dropped": self.dropped + sum(s.dropped for members in self.subscribers.values() for s in members),
+        }
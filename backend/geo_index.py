@@ -0,0 +1,102 @@
+import math
+from collections import defaultdict
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def has_coordinates(item):
+    lat, lng = item.get("latitude"), item.get("longitude")
+    return lat is not None and lng is not None and -90 <= lat <= 90 and -180 <= lng <= 180
+
+
+def grid_cell(lat, lng, cell_deg):
+    return int(math.floor(lat / cell_deg)), int(math.floor(lng / cell_deg))
+
+
+def grid_cells_within(lat, lng, radius_km, cell_deg):
+    """Grid cells overlapping the bounding box of a circle; callers still check the distance."""
+    lat_span = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(-90.0, lat - lat_span), min(90.0, lat + lat_span)
+    # Longitude degrees shrink towards the poles; use the widest latitude in the box.
+    widest = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(widest))
+    lng_span = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+
+    min_row, min_col = grid_cell(min_lat, lng - lng_span, cell_deg)
+    max_row, max_col = grid_cell(max_lat, lng + lng_span, cell_deg)
+    wrap = int(round(360 / cell_deg))
+    half = wrap // 2
+    for row in range(min_row, max_row + 1):
+        for col in range(min_col, max_col + 1):
+            # Fold columns back into [-180, 180) so queries across the antimeridian work.
+            yield row, (col + half) % wrap - half
+
+
+# ------------------ GRID INDEX ------------------
+class GeoIndex:
+    """Fixed-size lat/lng grid over active items that have coordinates."""
+
+    def __init__(self, cell_deg=0.05):
+        self.cell_deg = cell_deg
+        self.cells = defaultdict(set)   # (row, col) -> item ids
+        self.points = {}                # item_id -> (lat, lng, cell, type, category)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, lat, lng):
+        return grid_cell(lat, lng, self.cell_deg)
+
+    def add(self, item):
+        item_id = item["id"]
+        self.remove(item_id)
+        if not has_coordinates(item):
+            return
+        lat, lng = item["latitude"], item["longitude"]
+        cell = self._cell(lat, lng)
+        self.cells[cell].add(item_id)
+        self.points[item_id] = (lat, lng, cell, item.get("type"), item.get("category"))
+
+    def remove(self, item_id):
+        point = self.points.pop(item_id, None)
+        if point is None:
+            return
+        cell = point[2]
+        members = self.cells[cell]
+        members.discard(item_id)
+        if not members:
+            del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.points.clear()
+
+    def _candidate_cells(self, lat, lng, radius_km):
+        return grid_cells_within(lat, lng, radius_km, self.cell_deg)
+
+    def nearby(self, lat, lng, radius_km, type=None, category=None, limit=50):
+        """Return ``[(item_id, distance_km), ...]`` sorted by distance."""
+        hits = []
+        seen = set()
+        for cell in self._candidate_cells(lat, lng, radius_km):
+            if cell in seen:
+                continue
+            seen.add(cell)
+            for item_id in self.cells.get(cell, ()):
+                p_lat, p_lng, _, item_type, item_category = self.points[item_id]
+                if (type and item_type != type) or (category and item_category != category):
+                    continue
+                distance = haversine_km(lat, lng, p_lat, p_lng)
+                if distance <= radius_km:
+                    hits.append((item_id, distance))
+        hits.sort(key=lambda hit: hit[1])
+        return hits[:limit]
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class HasherOverloaded(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Runs passlib hashing on a bounded thread pool so it never blocks the event loop.
+
+    At most ``workers`` hashes run at once and at most ``max_queue`` callers may wait
+    for a slot; anything beyond that fails fast with ``HasherOverloaded``.
+    """
+
+    def __init__(self, pwd_context, workers=4, max_queue=64, observer=None):
+        self.pwd_context = pwd_context
+        self.observer = observer    # called as observer(operation, wait_seconds, run_seconds)
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._slots = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    async def _run(self, operation, fn, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HasherOverloaded()
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        wait_seconds = started_at - queued_at
+        self.total_wait_seconds += wait_seconds
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            run_seconds = time.perf_counter() - started_at
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_seconds += run_seconds
+            self._slots.release()
+            if self.observer:
+                self.observer(operation, wait_seconds, run_seconds)
+
+    async def hash(self, password):
+        return await self._run("hash", self.pwd_context.hash, password)
+
+    async def verify(self, password, hashed_password):
+        return await self._run("verify", self.pwd_context.verify, password, hashed_password)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "peak_queue_depth": self.peak_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_hash_ms": round(1000 * self.total_seconds / self.completed, 2) if self.completed else 0.0,
+            "avg_wait_ms": round(1000 * self.total_wait_seconds / self.completed, 2) if self.completed else 0.0,
+        }
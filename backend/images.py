@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+ALLOWED_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+# name -> (longest side in px or None for full size, output format)
+VARIANTS = {
+    "thumb.jpg": (256, "JPEG"),
+    "thumb.webp": (256, "WEBP"),
+    "medium.jpg": (1024, "JPEG"),
+    "medium.webp": (1024, "WEBP"),
+    "full.webp": (None, "WEBP"),
+}
+
+MEDIA_TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp", "gif": "image/gif"}
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+FILENAME_RE = re.compile(r"^[a-z]+\.(jpg|png|webp|gif)$")
+
+
+class InvalidImage(Exception):
+    pass
+
+
+# What Pillow raises for corrupt, truncated or oversized input.
+DECODE_ERRORS = (UnidentifiedImageError, OSError, SyntaxError, ValueError, Image.DecompressionBombError)
+
+
+def _render_variants(original_path, out_dir):
+    """Runs in a worker process: decode once, write every sized variant."""
+    written = {}
+    with Image.open(original_path) as source:
+        source = ImageOps.exif_transpose(source)
+        for name, (max_side, fmt) in VARIANTS.items():
+            image = source.copy()
+            if max_side:
+                image.thumbnail((max_side, max_side), Image.LANCZOS)
+            if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            target = Path(out_dir) / name
+            tmp = target.with_suffix(target.suffix + ".tmp")
+            if fmt == "JPEG":
+                image.save(tmp, fmt, quality=82, optimize=True, progressive=True)
+            else:
+                image.save(tmp, fmt, quality=80, method=4)
+            os.replace(tmp, target)
+            written[name] = {"width": image.width, "height": image.height, "bytes": target.stat().st_size}
+    return written
+
+
+class ImageStore:
+    """Content-addressed image storage on local disk.
+
+    Each upload lives under ``<root>/<digest[:2]>/<digest>/`` with the original bytes,
+    its variants and a manifest. Identical uploads resolve to the same directory.
+    """
+
+    def __init__(self, root, max_bytes=10 * 1024 * 1024, workers=2):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._executor = None
+        self._locks = {}   # digest -> [asyncio.Lock, callers using it]
+        self.deduplicated = 0
+
+    def _dir(self, digest):
+        return self.root / digest[:2] / digest
+
+    def manifest(self, digest):
+        if not DIGEST_RE.match(digest):
+            return None
+        try:
+            return json.loads((self._dir(digest) / "manifest.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def path(self, digest, filename):
+        if not DIGEST_RE.match(digest) or not FILENAME_RE.match(filename):
+            return None
+        path = self._dir(digest) / filename
+        return path if path.is_file() else None
+
+    async def save(self, data):
+        if len(data) > self.max_bytes:
+            raise InvalidImage(f"Image exceeds {self.max_bytes // (1024 * 1024)} MB")
+        # Parsing the header and hashing up to ``max_bytes`` would stall the event loop.
+        fmt, width, height, digest = await asyncio.to_thread(self._inspect, data)
+
+        # The entry counts every caller holding or waiting on the lock; it goes away with the
+        # last one. locked() can't tell: release() clears it before the next waiter resumes.
+        entry = self._locks.get(digest)
+        if entry is None:
+            entry = self._locks[digest] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                existing = self.manifest(digest)
+                if existing:
+                    self.deduplicated += 1
+                    return existing
+
+                out_dir = self._dir(digest)
+                try:
+                    return await self._store(data, digest, fmt, width, height, out_dir)
+                except BaseException:
+                    # Without a manifest the directory is garbage; the next upload starts clean.
+                    await asyncio.to_thread(shutil.rmtree, out_dir, True)
+                    raise
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[digest]
+
+    async def _store(self, data, digest, fmt, width, height, out_dir):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        original = out_dir / f"original.{ALLOWED_FORMATS[fmt]}"
+        await asyncio.to_thread(original.write_bytes, data)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            variants = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _render_variants, str(original), str(out_dir)
+            )
+        except DECODE_ERRORS as exc:
+            # verify() only checks the header; a truncated body fails here, in the full decode.
+            raise InvalidImage("File is not a supported image") from exc
+        variants[original.name] = {"width": width, "height": height, "bytes": len(data)}
+
+        manifest = {"id": digest, "format": fmt, "width": width, "height": height, "variants": variants}
+        # The manifest is written last: its presence marks a complete upload.
+        await asyncio.to_thread((out_dir / "manifest.json").write_text, json.dumps(manifest))
+        return manifest
+
+    def _inspect(self, data):
+        fmt, width, height = self._identify(data)
+        return fmt, width, height, hashlib.sha256(data).hexdigest()
+
+    def _identify(self, data):
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                fmt, size = image.format, image.size
+                image.verify()
+        except DECODE_ERRORS:
+            raise InvalidImage("File is not a supported image")
+        if fmt not in ALLOWED_FORMATS:
+            raise InvalidImage(f"Unsupported image format {fmt}")
+        return fmt, size[0], size[1]
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,230 @@
+import asyncio
+import heapq
+import logging
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from pymongo import UpdateOne
+
+from geo_index import EARTH_RADIUS_KM
+from search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+OPPOSITE_TYPE = {"lost": "found", "found": "lost"}
+
+WEIGHTS = {"category": 0.30, "color": 0.15, "text": 0.40, "distance": 0.15}
+HASH_DIM = 1 << 12
+DISTANCE_SCALE_KM = 5.0
+MIN_SCORE = 0.35
+# Candidates are scored this many rows at a time, bounding the dense hash matrix to ~8 MB.
+SCORE_BLOCK = 512
+
+CANDIDATE_PROJECTION = {"_id": 0, "id": 1, "type": 1, "title": 1, "description": 1,
+                        "category": 1, "color": 1, "location": 1, "latitude": 1, "longitude": 1}
+
+
+# ------------------ VECTORIZED SCORING ------------------
+def _text(item):
+    return " ".join(filter(None, (item.get("title"), item.get("title"), item.get("description"), item.get("location"))))
+
+
+def _hash_vectors(docs):
+    """Hashed, L2-normalised bag-of-words rows, one per document."""
+    matrix = np.zeros((len(docs), HASH_DIM), dtype=np.float32)
+    for row, doc in enumerate(docs):
+        for token in tokenize(_text(doc)):
+            matrix[row, zlib.crc32(token.encode()) & (HASH_DIM - 1)] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _coords(docs):
+    lat = np.array([np.nan if d.get("latitude") is None else d["latitude"] for d in docs], dtype=np.float64)
+    lng = np.array([np.nan if d.get("longitude") is None else d["longitude"] for d in docs], dtype=np.float64)
+    return lat, lng
+
+
+def score_candidates(item, candidates):
+    """Score one item against a block of candidates.
+
+    Returns a dict of equally sized arrays: the weighted ``score`` plus each component.
+    """
+    n = len(candidates)
+    category = np.fromiter((c.get("category") == item.get("category") for c in candidates), dtype=np.float32, count=n)
+    color_key = (item.get("color") or "").strip().lower()
+    color = np.fromiter(
+        (bool(color_key) and (c.get("color") or "").strip().lower() == color_key for c in candidates),
+        dtype=np.float32, count=n,
+    )
+
+    vectors = _hash_vectors([item] + candidates)
+    text = vectors[1:] @ vectors[0]
+
+    distance_km = np.full(n, np.nan)
+    distance = np.zeros(n, dtype=np.float32)
+    if item.get("latitude") is not None and item.get("longitude") is not None:
+        lat, lng = _coords(candidates)
+        phi1, phi2 = np.radians(item["latitude"]), np.radians(lat)
+        d_lambda = np.radians(lng - item["longitude"])
+        a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+        distance_km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+        distance = np.nan_to_num(np.exp(-distance_km / DISTANCE_SCALE_KM), nan=0.0).astype(np.float32)
+
+    score = (WEIGHTS["category"] * category + WEIGHTS["color"] * color
+             + WEIGHTS["text"] * text + WEIGHTS["distance"] * distance)
+    return {"score": score, "category": category, "color": color, "text": text, "distance_km": distance_km}
+
+
+def top_matches(item, candidates, k, block_size=SCORE_BLOCK):
+    """Best ``k`` candidates at or above MIN_SCORE, scored block by block with a running top-k."""
+    best = []   # (-score, position, match), so ties keep candidate order
+    for start in range(0, len(candidates), block_size):
+        block = candidates[start:start + block_size]
+        scored = score_candidates(item, block)
+        score = scored["score"]
+        keep = np.flatnonzero(score >= MIN_SCORE)
+        if keep.size > k:
+            keep = keep[np.argpartition(-score[keep], k - 1)[:k]]
+        for i in keep:
+            best.append((-float(score[i]), start + int(i), {
+                "item_id": block[i]["id"],
+                "score": round(float(score[i]), 4),
+                "text_similarity": round(float(scored["text"][i]), 4),
+                "same_category": bool(scored["category"][i]),
+                "same_color": bool(scored["color"][i]),
+                "distance_km": None if np.isnan(scored["distance_km"][i]) else round(float(scored["distance_km"][i]), 3),
+            }))
+        if len(best) > k:
+            best = heapq.nsmallest(k, best, key=lambda entry: entry[:2])
+    best.sort(key=lambda entry: entry[:2])
+    return [match for _, _, match in best]
+
+
+# ------------------ BACKGROUND PIPELINE ------------------
+class MatchEngine:
+    """Background worker that matches newly posted items against the opposite type.
+
+    The queue lives in memory, so a periodic sweep (also run at startup) re-queues
+    recently created or reactivated items whose own matches were never written.
+    """
+
+    def __init__(self, top_k=10, max_candidates=5000, batch_size=32,
+                 sweep_seconds=300.0, sweep_lookback_seconds=86400.0, sweep_limit=2000):
+        self.top_k = top_k
+        self.max_candidates = max_candidates
+        self.batch_size = batch_size
+        self.sweep_seconds = sweep_seconds
+        self.sweep_lookback_seconds = sweep_lookback_seconds
+        self.sweep_limit = sweep_limit
+        self.queue = asyncio.Queue()
+        self.db = None
+        self.requeued = 0
+        self._tasks = []
+
+    def start(self, db):
+        self.db = db
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._sweep_loop())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def submit(self, item_id):
+        self.queue.put_nowait(item_id)
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self.process(dict.fromkeys(batch))
+            except Exception:
+                logger.exception("Match pipeline failed for %d items", len(batch))
+
+    async def _sweep_loop(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Match sweep failed")
+            await asyncio.sleep(self.sweep_seconds)
+
+    async def sweep(self):
+        """Queue recent active items matched before their last activation, or never."""
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.sweep_lookback_seconds)
+        items = await self.db.items.find(
+            {"status": "active", "type": {"$in": list(OPPOSITE_TYPE)},
+             "$or": [{"created_at": {"$gte": since}}, {"status_changed_at": {"$gte": since}}]},
+            {"_id": 0, "id": 1, "created_at": 1, "status_changed_at": 1},
+        ).sort("created_at", -1).limit(self.sweep_limit).to_list(self.sweep_limit)
+        if not items:
+            return 0
+        matched_at = {doc["item_id"]: doc.get("matched_at") async for doc in self.db.matches.find(
+            {"item_id": {"$in": [item["id"] for item in items]}}, {"_id": 0, "item_id": 1, "matched_at": 1})}
+        stale = 0
+        for item in items:
+            done = matched_at.get(item["id"])
+            activated = max(filter(None, (item.get("created_at"), item.get("status_changed_at"))))
+            if done is None or done < activated:
+                self.submit(item["id"])
+                stale += 1
+        if stale:
+            self.requeued += stale
+            logger.info("Re-queued %d items for matching", stale)
+        return stale
+
+    async def _candidates(self, item):
+        # Block on category or color so we never score against the entire opposite side.
+        query = {
+            "status": "active",
+            "type": OPPOSITE_TYPE[item["type"]],
+            "$or": [{"category": item.get("category")}, {"color": item.get("color")}],
+        }
+        cursor = self.db.items.find(query, CANDIDATE_PROJECTION).sort("created_at", -1).limit(self.max_candidates)
+        return await cursor.to_list(self.max_candidates)
+
+    async def process(self, item_ids):
+        items = await self.db.items.find(
+            {"id": {"$in": list(item_ids)}, "status": "active"}, CANDIDATE_PROJECTION
+        ).to_list(None)
+        now = datetime.now(timezone.utc)
+        writes = []
+        for item in items:
+            if item.get("type") not in OPPOSITE_TYPE:
+                continue
+            candidates = await self._candidates(item)
+            # Offloaded so large candidate blocks never stall the event loop.
+            matches = await asyncio.to_thread(top_matches, item, candidates, self.top_k)
+            writes.append(UpdateOne(
+                {"item_id": item["id"]},
+                {"$set": {"item_id": item["id"], "matches": matches, "updated_at": now, "matched_at": now}},
+                upsert=True,
+            ))
+            # Keep the counterpart lists current too, bounded to the same top-k.
+            for match in matches:
+                reverse = dict(match, item_id=item["id"])
+                writes.append(UpdateOne(
+                    {"item_id": match["item_id"]},
+                    {
+                        "$pull": {"matches": {"item_id": item["id"]}},
+                        "$set": {"updated_at": now},
+                    },
+                    upsert=True,
+                ))
+                writes.append(UpdateOne(
+                    {"item_id": match["item_id"]},
+                    {"$push": {"matches": {"$each": [reverse], "$sort": {"score": -1}, "$slice": self.top_k}}},
+                ))
+        if writes:
+            # Ordered, so each counterpart's $pull still lands before its $push.
+            await self.db.matches.bulk_write(writes, ordered=True)
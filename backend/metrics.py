@@ -0,0 +1,255 @@
+import contextvars
+import math
+import threading
+import time
+
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ------------------ PRIMITIVES ------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()   # DB listeners report from driver threads
+        self._values = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in sorted(items):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, *labels, value):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._values.items()]
+        for labels, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []   # callables run before each scrape to refresh gauges
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")))
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")))
+IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."))
+REQUEST_DB_SECONDS = registry.register(Histogram(
+    "http_request_db_seconds", "MongoDB time spent per request.", ("route",)))
+REQUEST_DB_CALLS = registry.register(Counter(
+    "http_request_db_calls_total", "MongoDB commands issued while serving requests.", ("route",)))
+REQUEST_HASH_SECONDS = registry.register(Counter(
+    "http_request_password_hash_seconds_total", "Password hashing time attributed to requests.", ("route",)))
+DB_COMMAND_SECONDS = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency.", ("command",)))
+DB_COMMANDS = registry.register(Counter(
+    "mongodb_commands_total", "MongoDB commands by outcome.", ("command", "outcome")))
+HASH_SECONDS = registry.register(Histogram(
+    "password_hash_duration_seconds", "Time spent hashing on the worker pool.", ("operation",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)))
+HASH_WAIT_SECONDS = registry.register(Histogram(
+    "password_hash_wait_seconds", "Time spent waiting for a hashing slot.", ("operation",)))
+RATE_LIMITED = registry.register(Counter(
+    "rate_limited_requests_total", "Requests rejected with 429 by rate limit rule.", ("rule",)))
+OUTBOX_MESSAGES = registry.register(Counter(
+    "outbox_deliveries_total", "Outbox delivery attempts by outcome.", ("outcome",)))
+OUTBOX_DELIVERY_SECONDS = registry.register(Histogram(
+    "outbox_delivery_latency_seconds", "Time from enqueue to a final delivery outcome.", ("outcome",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)))
+LOAD_SHED = registry.register(Counter(
+    "load_shed_requests_total", "Requests rejected with 503 by the concurrency cap."))
+
+
+# ------------------ PER-REQUEST ATTRIBUTION ------------------
+class RequestStats:
+    __slots__ = ("db_seconds", "db_calls", "hash_seconds")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.db_calls = 0
+        self.hash_seconds = 0.0
+
+
+# Motor copies the context into its executor threads, so listeners see the request's stats.
+current_request = contextvars.ContextVar("current_request", default=None)
+
+
+class DbMetricsListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _record(self, event, outcome):
+        seconds = event.duration_micros / 1e6
+        DB_COMMAND_SECONDS.observe(event.command_name, value=seconds)
+        DB_COMMANDS.inc(event.command_name, outcome)
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_seconds += seconds
+            stats.db_calls += 1
+
+
+def observe_password_hash(operation, wait_seconds, run_seconds):
+    HASH_SECONDS.observe(operation, value=run_seconds)
+    HASH_WAIT_SECONDS.observe(operation, value=wait_seconds)
+    stats = current_request.get()
+    if stats is not None:
+        stats.hash_seconds += run_seconds
+
+
+def observe_outbox_delivery(outcome, seconds):
+    OUTBOX_MESSAGES.inc(outcome)
+    if outcome != "retry":
+        OUTBOX_DELIVERY_SECONDS.observe(outcome, value=seconds)
+
+
+# ------------------ MIDDLEWARE ------------------
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and DB/hash time per route template."""
+
+    def __init__(self, app, exclude=("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+        self._routes = None
+
+    def _route_label(self, scope):
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None:
+            app = scope.get("app")
+            self._routes = {getattr(r, "endpoint", None): r.path for r in getattr(app, "routes", ())}
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+        IN_FLIGHT.inc()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            current_request.reset(token)
+            route = self._route_label(scope)
+            method = scope["method"]
+            REQUESTS.inc(method, route, str(status))
+            REQUEST_SECONDS.observe(method, route, value=time.perf_counter() - started)
+            REQUEST_DB_SECONDS.observe(route, value=stats.db_seconds)
+            if stats.db_calls:
+                REQUEST_DB_CALLS.inc(route, amount=stats.db_calls)
+            if stats.hash_seconds:
+                REQUEST_HASH_SECONDS.inc(route, amount=stats.hash_seconds)
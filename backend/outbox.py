@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import random
+import smtplib
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+
+def _aware(value):
+    # Mongo hands datetimes back naive (UTC).
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+# ------------------ TRANSPORTS ------------------
+class Transport:
+    """Delivers one outbox message (``to``, ``subject``, ``body``). Raise to have it retried."""
+
+    async def send(self, message):
+        raise NotImplementedError
+
+
+class LogTransport(Transport):
+    """Development transport: logs what would have been sent."""
+
+    async def send(self, message):
+        logger.info("Outbox message to %s: %s", message["to"], message["subject"])
+
+
+class SmtpTransport(Transport):
+    """Plain smtplib on a worker thread. Point it at a local stand-in such as
+    ``python -m aiosmtpd -n -l localhost:1025`` to test delivery end to end."""
+
+    def __init__(self, host, port=25, sender="no-reply@localhost", username=None, password=None,
+                 starttls=False, timeout=10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def _send(self, message):
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message["to"]
+        email["Subject"] = message["subject"]
+        email.set_content(message["body"])
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(email)
+
+    async def send(self, message):
+        await asyncio.to_thread(self._send, message)
+
+
+# ------------------ OUTBOX ------------------
+class Outbox:
+    """Persistent queue of outgoing notifications drained by a pool of background workers.
+
+    ``enqueue`` is one insert; a unique ``dedup_key`` makes repeated submissions of the
+    same notification a no-op. Workers claim batches by stamping a claim token with a
+    lease, so records from a crashed worker become claimable again once the lease ends.
+    Records are sent one after another, so a worker renews its lease while it works
+    through a batch and skips any record whose lease another worker has taken over.
+    Failures are retried with exponential backoff until ``max_attempts``.
+    """
+
+    def __init__(self, transport, collection="outbox", workers=2, batch_size=20, max_attempts=6,
+                 base_backoff=5.0, max_backoff=900.0, lease_seconds=120.0, poll_seconds=5.0, observer=None):
+        self.transport = transport
+        self.collection = collection
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.observer = observer    # called as observer(outcome, seconds_since_enqueue)
+        self.depth = 0              # pending + in-flight records as of the last poll
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.db = None
+        self._wake = None
+        self._tasks = []
+
+    def _coll(self):
+        return self.db[self.collection]
+
+    async def enqueue(self, db, kind, to, subject, body, dedup_key):
+        """Queue one message; returns its id (the existing one for a duplicate)."""
+        now = datetime.now(timezone.utc)
+        record = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "to": to,
+            "subject": subject,
+            "body": body,
+            "dedup_key": dedup_key,
+            "status": PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }
+        try:
+            await db[self.collection].insert_one(record)
+        except DuplicateKeyError:
+            self.deduplicated += 1
+            existing = await db[self.collection].find_one({"dedup_key": dedup_key}, {"_id": 0, "id": 1})
+            return existing["id"] if existing else None
+        self.depth += 1
+        if self._wake is not None:
+            self._wake.set()
+        return record["id"]
+
+    def start(self, db):
+        self.db = db
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def _backoff(self, attempts):
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)   # jitter keeps retries from arriving in waves
+
+    async def claim(self, now):
+        due = {"$or": [
+            {"status": PENDING, "next_attempt_at": {"$lte": now}},
+            {"status": SENDING, "lease_until": {"$lt": now}},
+        ]}
+        candidates = await self._coll().find(due, {"_id": 0, "id": 1}).sort(
+            "next_attempt_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not candidates:
+            return []
+        token = str(uuid.uuid4())
+        # Re-checking the due filter in the update means two workers never claim one record.
+        await self._coll().update_many(
+            {"id": {"$in": [c["id"] for c in candidates]}, **due},
+            {"$set": {"status": SENDING, "claim": token, "lease_until": now + timedelta(seconds=self.lease_seconds)}},
+        )
+        return await self._coll().find({"claim": token}, {"_id": 0}).to_list(self.batch_size)
+
+    async def renew(self, records, now):
+        """Extend the lease on ``records``; returns the ones this worker still holds."""
+        token = records[0]["claim"]
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        result = await self._coll().update_many(
+            {"id": {"$in": [r["id"] for r in records]}, "claim": token, "status": SENDING},
+            {"$set": {"lease_until": lease_until}},
+        )
+        if result.modified_count < len(records):
+            held = {doc["id"] async for doc in self._coll().find(
+                {"id": {"$in": [r["id"] for r in records]}, "claim": token}, {"_id": 0, "id": 1})}
+            records = [r for r in records if r["id"] in held]
+        for record in records:
+            record["lease_until"] = lease_until
+        return records
+
+    async def deliver(self, records):
+        ops = []
+        lost = set()
+        for position, record in enumerate(records):
+            if record["id"] in lost:
+                continue
+            # A slow transport can outlast the lease; renew once half of it is used up.
+            now = datetime.now(timezone.utc)
+            if _aware(record["lease_until"]) - now < timedelta(seconds=self.lease_seconds / 2):
+                held = {r["id"] for r in await self.renew(records[position:], now)}
+                lost.update(r["id"] for r in records[position:] if r["id"] not in held)
+                if record["id"] in lost:
+                    continue
+            try:
+                await self.transport.send(record)
+                error = None
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            now = datetime.now(timezone.utc)
+            attempts = record.get("attempts", 0) + 1
+            waited = (now - _aware(record["created_at"])).total_seconds()
+            if error is None:
+                update, outcome = {"status": SENT, "sent_at": now}, SENT
+                self.sent += 1
+            elif attempts >= self.max_attempts:
+                update, outcome = {"status": FAILED, "last_error": error}, FAILED
+                self.failed += 1
+                logger.warning("Outbox message %s failed after %d attempts: %s", record["id"], attempts, error)
+            else:
+                update, outcome = {
+                    "status": PENDING, "last_error": error,
+                    "next_attempt_at": now + timedelta(seconds=self._backoff(attempts)),
+                }, "retry"
+                self.retried += 1
+            if outcome != "retry":
+                self.depth = max(0, self.depth - 1)
+            if self.observer:
+                self.observer(outcome, waited)
+            ops.append(UpdateOne(
+                {"id": record["id"], "claim": record["claim"]},
+                {"$set": {**update, "attempts": attempts}, "$unset": {"claim": "", "lease_until": ""}},
+            ))
+        if ops:
+            await self._coll().bulk_write(ops, ordered=False)
+
+    async def _run(self):
+        while True:
+            try:
+                records = await self.claim(datetime.now(timezone.utc))
+                if records:
+                    await self.deliver(records)
+                    continue
+                self.depth = await self._coll().count_documents({"status": {"$in": [PENDING, SENDING]}})
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox worker failed")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "transport": type(self.transport).__name__,
+            "queue_depth": self.depth,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+        }
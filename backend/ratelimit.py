@@ -0,0 +1,185 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class Rate:
+    """``limit`` requests per ``period`` seconds, allowing bursts of up to ``limit``."""
+
+    __slots__ = ("limit", "period")
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+
+    @classmethod
+    def parse(cls, value):
+        # "10/60" -> 10 requests per 60 seconds
+        limit, _, period = value.partition("/")
+        return cls(int(limit), float(period or 1))
+
+    @property
+    def per_second(self):
+        return self.limit / self.period
+
+
+# ------------------ BACKENDS ------------------
+class RateLimitBackend:
+    """Storage for token buckets. Swap in a shared implementation (e.g. Redis) for multi-worker limits."""
+
+    async def take(self, key, rate, cost=1):
+        """Consume ``cost`` tokens; return ``(allowed, retry_after_seconds)``."""
+        raise NotImplementedError
+
+
+class InMemoryBackend(RateLimitBackend):
+    def __init__(self, max_keys=100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()   # key -> [tokens, updated_at]
+
+    async def take(self, key, rate, cost=1):
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(rate.limit), now]
+            if len(self._buckets) > self.max_keys:
+                # Evicting the least recently used bucket only ever makes a client less limited.
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(rate.limit, bucket[0] + (now - bucket[1]) * rate.per_second)
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return True, 0.0
+        return False, (cost - bucket[0]) / rate.per_second
+
+
+class RateLimiter:
+    def __init__(self, rules, backend=None):
+        self.rules = rules
+        self.backend = backend or InMemoryBackend()
+        self.rejected = {}
+
+    async def check(self, rule, key):
+        """Return seconds to wait, or 0 when the request is allowed."""
+        rate = self.rules.get(rule)
+        if rate is None:
+            return 0
+        allowed, retry_after = await self.backend.take(f"{rule}:{key}", rate)
+        if allowed:
+            return 0
+        self.rejected[rule] = self.rejected.get(rule, 0) + 1
+        return max(1, int(retry_after + 0.999))
+
+    def stats(self):
+        return {
+            "rules": {name: f"{rate.limit}/{rate.period:g}s" for name, rate in self.rules.items()},
+            "rejected": dict(self.rejected),
+        }
+
+
+# ------------------ ADMISSION CONTROL ------------------
+class ConcurrencyLimiter:
+    """Counts requests in flight; over ``max_in_flight`` new ones are refused rather than queued."""
+
+    def __init__(self, max_in_flight=512, retry_after=1):
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.shed = 0
+
+    def try_acquire(self):
+        if self.in_flight >= self.max_in_flight:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    def stats(self):
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "shed": self.shed,
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware answering 503 + Retry-After as soon as the concurrency cap is reached."""
+
+    def __init__(self, app, limiter, exempt=(), observer=None):
+        self.app = app
+        self.limiter = limiter
+        self.exempt = tuple(exempt)
+        self.observer = observer   # called with no arguments for every shed request
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.try_acquire():
+            if self.observer:
+                self.observer()
+            body = json.dumps({"detail": "Server overloaded, please retry"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.limiter.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+
+_untrusted_proxy_reported = False
+
+
+def client_ip(request, trusted_proxies=0):
+    """Address of the caller as seen by the outermost of ``trusted_proxies`` proxies.
+
+    Proxies append the address they received from to X-Forwarded-For, so only the last
+    ``trusted_proxies`` hops were written by our own infrastructure; anything to their
+    left came from the client and can be forged.
+    """
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        if trusted_proxies > 0:
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            if hops:
+                return hops[-min(trusted_proxies, len(hops))]
+        else:
+            report_untrusted_proxy()
+    return request.client.host if request.client else "unknown"
+
+
+def report_untrusted_proxy():
+    """Log once that requests arrive through a proxy whose X-Forwarded-For is ignored.
+
+    Every client then shares the proxy's address, so per-IP limits apply site-wide.
+    """
+    global _untrusted_proxy_reported
+    if not _untrusted_proxy_reported:
+        _untrusted_proxy_reported = True
+        logger.error("Requests carry X-Forwarded-For but TRUSTED_PROXY_COUNT is 0: per-IP rate limits "
+                     "key on the proxy and apply to all clients together. Set TRUSTED_PROXY_COUNT to the "
+                     "number of proxies in front of the API when it is only reachable through them.")
@@ -0,0 +1,243 @@
+import asyncio
+import calendar
+import logging
+import sys
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("id", "user_id", "type", "title", "description", "category", "color", "location",
+          "latitude", "longitude", "contact_email", "contact_phone", "image_url", "status",
+          "view_count", "contact_count", "created_at")
+
+# Counters are written behind and only refreshed here on resync.
+COUNTER_FIELDS = ("view_count", "contact_count")
+
+# Low-cardinality values are interned so thousands of records share one string object.
+INTERNED = ("type", "category", "color", "status")
+
+
+def _created_ms(value):
+    if not isinstance(value, datetime):
+        return 0
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    # Integer arithmetic truncates like Mongo's millisecond storage; float timestamps can round.
+    return calendar.timegm(value.timetuple()) * 1000 + value.microsecond // 1000
+
+
+class ItemRecord:
+    __slots__ = FIELDS + ("created_ms",)
+
+    def __init__(self, doc):
+        for field in FIELDS:
+            value = doc.get(field, 0 if field in COUNTER_FIELDS else None)
+            if field in INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+        # Match what a Mongo read returns: naive UTC truncated to milliseconds.
+        self.created_ms = _created_ms(self.created_at)
+        self.created_at = datetime.fromtimestamp(self.created_ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+        self.status = "active"
+
+    def to_doc(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+
+class ActiveReplica:
+    """Read-only in-process copy of every active item.
+
+    Records are indexed by id and kept in per-filter lists sorted by (created_ms, id)
+    for the four listing shapes: all, by type, by category, by type and category.
+
+    Local writes apply immediately. Every ``refresh_seconds`` the items created or
+    changed status since the last sync, on any worker, are read back and applied, and
+    every ``resync_seconds`` the whole replica is rebuilt, which also refreshes the
+    written-behind counters.
+    """
+
+    def __init__(self, resync_seconds=300.0, refresh_seconds=15.0, overlap_seconds=60.0):
+        self.resync_seconds = resync_seconds
+        self.refresh_seconds = refresh_seconds
+        self.overlap_seconds = overlap_seconds   # re-read this much before the watermark for clock skew
+        self.ready = False
+        self.watermark = None                    # wall clock taken just before the last scan
+        self.last_sync_at = None
+        self.last_sync_seconds = None
+        self.last_refresh_at = None
+        self._task = None
+        self._journal = None              # writes seen while a resync scan is running
+        self.records = {}
+        self.sorted = defaultdict(list)   # (type, category) filter -> [(created_ms, id)] ascending
+
+    def __len__(self):
+        return len(self.records)
+
+    def _keys(self, record):
+        return {(None, None), (record.type, None), (None, record.category), (record.type, record.category)}
+
+    def add(self, doc):
+        if self._journal is not None:
+            self._journal.append((True, doc))
+        self._remove(doc["id"])
+        record = ItemRecord(doc)
+        self.records[record.id] = record
+        entry = (record.created_ms, record.id)
+        for key in self._keys(record):
+            insort(self.sorted[key], entry)
+
+    def remove(self, item_id):
+        if self._journal is not None:
+            self._journal.append((False, item_id))
+        self._remove(item_id)
+
+    def _remove(self, item_id):
+        record = self.records.pop(item_id, None)
+        if record is None:
+            return
+        entry = (record.created_ms, record.id)
+        for key in self._keys(record):
+            entries = self.sorted[key]
+            position = bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+            if not entries:
+                del self.sorted[key]
+
+    def get(self, item_id):
+        record = self.records.get(item_id)
+        return record.to_doc() if record else None
+
+    def page(self, type=None, category=None, skip=0, limit=50, before=None):
+        """Newest-first slice of one listing; ``before`` is an exclusive (created_ms, id) bound."""
+        entries = self.sorted.get((type or None, category or None), ())
+        end = len(entries) if before is None else bisect_left(entries, before)
+        end -= skip
+        if end <= 0:
+            return []
+        start = max(0, end - limit)
+        return [self.records[item_id].to_doc() for _, item_id in reversed(entries[start:end])]
+
+    async def resync(self, db, projection):
+        started = time.perf_counter()
+        watermark = datetime.now(timezone.utc)
+        records, ordered = {}, defaultdict(list)
+        self._journal = []
+        try:
+            async for doc in db.items.find({"status": "active"}, projection):
+                record = ItemRecord(doc)
+                records[record.id] = record
+                entry = (record.created_ms, record.id)
+                for key in self._keys(record):
+                    ordered[key].append(entry)
+            for entries in ordered.values():
+                entries.sort()
+            # Swap in one step so readers never see a half-built replica, then replay
+            # the writes that raced with the scan.
+            journal = self._journal
+            self._journal = None
+            self.records, self.sorted = records, ordered
+            for is_add, value in journal:
+                if is_add:
+                    self.add(value)
+                else:
+                    self._remove(value)
+        finally:
+            self._journal = None
+        self.ready = True
+        self.watermark = watermark
+        self.last_sync_at = datetime.now(timezone.utc)
+        self.last_sync_seconds = round(time.perf_counter() - started, 3)
+        logger.info("Hot replica synced: %d active items in %.3fs", len(records), self.last_sync_seconds)
+
+    async def refresh(self, db, projection):
+        """Apply the items created or changed status since the last sync; returns how many."""
+        if self.watermark is None:
+            await self.resync(db, projection)
+            return len(self.records)
+        watermark = datetime.now(timezone.utc)
+        since = self.watermark - timedelta(seconds=self.overlap_seconds)
+        self._journal = []
+        try:
+            # Not limited to active items: the ones that left the active state must go.
+            changed = await db.items.find(
+                {"$or": [{"created_at": {"$gte": since}}, {"status_changed_at": {"$gte": since}}]},
+                {**projection, "status": 1},
+            ).to_list(None)
+            journal = self._journal
+            self._journal = None
+            for doc in changed:
+                if doc.get("status") == "active":
+                    self.add(doc)
+                else:
+                    self._remove(doc["id"])
+            # Local writes made during the read are newer than what it returned.
+            for is_add, value in journal:
+                if is_add:
+                    self.add(value)
+                else:
+                    self._remove(value)
+        finally:
+            self._journal = None
+        self.watermark = watermark
+        self.last_refresh_at = datetime.now(timezone.utc)
+        return len(changed)
+
+    def start(self, db, projection):
+        self._task = asyncio.create_task(self._run(db, projection))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db, projection):
+        interval = min(self.refresh_seconds, self.resync_seconds) if self.refresh_seconds > 0 else self.resync_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if (self.refresh_seconds <= 0 or self.last_sync_at is None or
+                        (datetime.now(timezone.utc) - self.last_sync_at).total_seconds() >= self.resync_seconds):
+                    await self.resync(db, projection)
+                else:
+                    await self.refresh(db, projection)
+            except Exception:
+                logger.exception("Hot replica resync failed")
+
+    def memory_report(self):
+        seen = set()
+
+        def size(obj):
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        record_bytes = value_bytes = 0
+        for record in self.records.values():
+            record_bytes += size(record)
+            for field in FIELDS:
+                value_bytes += size(getattr(record, field))
+        index_bytes = size(self.records) + size(self.sorted)
+        for entries in self.sorted.values():
+            index_bytes += size(entries) + sum(size(entry) for entry in entries)
+        total = record_bytes + value_bytes + index_bytes
+        count = len(self.records)
+        return {
+            "items": count,
+            "record_bytes": record_bytes,
+            "value_bytes": value_bytes,
+            "index_bytes": index_bytes,
+            "total_bytes": total,
+            "bytes_per_item": round(total / count, 1) if count else 0,
+            "last_sync_at": self.last_sync_at,
+            "last_sync_seconds": self.last_sync_seconds,
+            "last_refresh_at": self.last_refresh_at,
+        }
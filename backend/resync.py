@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _build(factories, docs):
+    indexes = [factory() for factory in factories]
+    for doc in docs:
+        for index in indexes:
+            index.add(doc)
+    return indexes
+
+
+class IndexResync:
+    """Owns the in-process indexes built from Mongo and keeps them in step across workers.
+
+    Writes made through this process update the indexes directly, but with several
+    workers each process only sees its own. Every ``resync_seconds`` each source with
+    ``changed_fields`` is refreshed from the documents whose timestamps moved since the
+    last sync; sources without them are rebuilt. A full rebuild also runs every
+    ``full_resync_seconds`` to drop anything a refresh cannot see, such as hard deletes.
+
+    A rebuild loads the documents, builds fresh indexes on a worker thread so the event
+    loop keeps serving requests, then swaps the fresh state into the live objects in a
+    single step and replays the writes that raced with the scan, as the hot replica
+    does. The live objects keep their identity, so callers holding them never need to
+    look them up again.
+    """
+
+    def __init__(self, resync_seconds=30.0, full_resync_seconds=21600.0, overlap_seconds=60.0):
+        self.resync_seconds = resync_seconds
+        self.full_resync_seconds = full_resync_seconds
+        self.overlap_seconds = overlap_seconds   # re-read this much before the watermark for clock skew
+        self.sources = {}     # collection -> (filter, projection, factories, live indexes, changed fields)
+        self._journals = {}   # collection -> writes seen while its scan is running
+        self.watermarks = {}  # collection -> wall clock taken just before the last scan
+        self.last_sync_at = {}
+        self.last_sync_seconds = {}
+        self.last_full_sync_at = {}
+        self._task = None
+
+    def register(self, collection, query, projection, *factories, changed_fields=()):
+        """Create one index per factory, fed from ``collection``; returns the live indexes.
+
+        ``query`` must be plain equality matches. ``changed_fields`` name the timestamps
+        every write to a matching document bumps; without them the source is only ever
+        rebuilt in full.
+        """
+        indexes = tuple(factory() for factory in factories)
+        self.sources[collection] = (query, projection, factories, indexes, tuple(changed_fields))
+        return indexes
+
+    def add(self, collection, doc):
+        journal = self._journals.get(collection)
+        if journal is not None:
+            journal.append((True, doc))
+        for index in self.sources[collection][3]:
+            index.add(doc)
+
+    def remove(self, collection, doc_id):
+        journal = self._journals.get(collection)
+        if journal is not None:
+            journal.append((False, doc_id))
+        for index in self.sources[collection][3]:
+            index.remove(doc_id)
+
+    def _replay(self, indexes, journal):
+        for is_add, value in journal:
+            for index in indexes:
+                if is_add:
+                    index.add(value)
+                else:
+                    index.remove(value)
+
+    def _synced(self, collection, watermark, started):
+        self.watermarks[collection] = watermark
+        self.last_sync_at[collection] = datetime.now(timezone.utc)
+        self.last_sync_seconds[collection] = round(time.perf_counter() - started, 3)
+
+    async def rebuild(self, db, collection):
+        query, projection, factories, indexes, _ = self.sources[collection]
+        started = time.perf_counter()
+        watermark = datetime.now(timezone.utc)
+        self._journals[collection] = journal = []
+        try:
+            docs = await db[collection].find(query, projection).to_list(None)
+            # Building is seconds of CPU for large collections; keep it off the event loop.
+            fresh = await asyncio.to_thread(_build, factories, docs)
+        finally:
+            del self._journals[collection]
+        for live, built in zip(indexes, fresh):
+            live.__dict__ = built.__dict__
+        self._replay(indexes, journal)
+        self._synced(collection, watermark, started)
+        self.last_full_sync_at[collection] = self.last_sync_at[collection]
+        return len(indexes[0])
+
+    async def refresh(self, db, collection):
+        """Apply only the documents changed since the last sync; falls back to a rebuild."""
+        query, projection, _, indexes, changed_fields = self.sources[collection]
+        if not changed_fields or collection not in self.watermarks:
+            return await self.rebuild(db, collection)
+        started = time.perf_counter()
+        watermark = datetime.now(timezone.utc)
+        since = self.watermarks[collection] - timedelta(seconds=self.overlap_seconds)
+        self._journals[collection] = journal = []
+        try:
+            # No filter on the query itself: documents that left it must be removed.
+            changed = await db[collection].find(
+                {"$or": [{field: {"$gte": since}} for field in changed_fields]},
+                {**projection, **{field: 1 for field in query}},
+            ).to_list(None)
+        finally:
+            del self._journals[collection]
+        for doc in changed:
+            if all(doc.get(field) == value for field, value in query.items()):
+                for index in indexes:
+                    index.add(doc)
+            else:
+                for index in indexes:
+                    index.remove(doc["id"])
+        # Local writes made during the read are newer than what it returned.
+        self._replay(indexes, journal)
+        self._synced(collection, watermark, started)
+        return len(changed)
+
+    def start(self, db):
+        if self.resync_seconds > 0:
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db):
+        while True:
+            await asyncio.sleep(self.resync_seconds)
+            for collection in self.sources:
+                last_full = self.last_full_sync_at.get(collection)
+                full = (self.full_resync_seconds > 0 and last_full is not None and
+                        (datetime.now(timezone.utc) - last_full).total_seconds() >= self.full_resync_seconds)
+                try:
+                    count = await (self.rebuild(db, collection) if full else self.refresh(db, collection))
+                except Exception:
+                    logger.exception("Index resync of %s failed", collection)
+                else:
+                    logger.info("Resynced %s indexes (%s): %d entries in %.3fs",
+                                collection, "full" if full else "refresh", count,
+                                self.last_sync_seconds[collection])
+
+    def stats(self):
+        return {
+            "resync_seconds": self.resync_seconds,
+            "full_resync_seconds": self.full_resync_seconds,
+            "sources": {
+                collection: {
+                    "entries": len(indexes[0]),
+                    "incremental": bool(changed_fields),
+                    "last_sync_at": self.last_sync_at.get(collection),
+                    "last_sync_seconds": self.last_sync_seconds.get(collection),
+                    "last_full_sync_at": self.last_full_sync_at.get(collection),
+                }
+                for collection, (_, _, _, indexes, changed_fields) in self.sources.items()
+            },
+        }
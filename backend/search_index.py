@@ -0,0 +1,234 @@
+import math
+import re
+import heapq
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# ------------------ TOKENIZATION ------------------
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "at", "be", "by", "for", "from", "has", "have",
+    "i", "in", "is", "it", "its", "my", "near", "of", "on", "or", "the",
+    "this", "to", "was", "were", "with",
+})
+
+# Matches in the title weigh more than matches buried in the description.
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "color": 2.0,
+    "location": 1.5,
+    "description": 1.0,
+}
+
+EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+# A corrected term scores this fraction of an exact hit per edit.
+FUZZY_PENALTY = 0.7
+
+
+def normalize_term(token):
+    # Cheap plural folding so "keys" finds "key" and "wallets" finds "wallet".
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [normalize_term(t) for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def trigrams(term):
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(term):
+    # Short words have too many neighbours to correct safely.
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (transpositions count once); ``limit + 1`` once exceeded."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class TrigramIndex:
+    """Character trigrams of a vocabulary, for finding known terms close to a misspelling."""
+
+    def __init__(self):
+        self.terms = defaultdict(set)   # trigram -> terms containing it
+
+    def add(self, term):
+        for gram in trigrams(term):
+            self.terms[gram].add(term)
+
+    def discard(self, term):
+        for gram in trigrams(term):
+            terms = self.terms.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self.terms[gram]
+
+    def clear(self):
+        self.terms.clear()
+
+    def similar(self, term, limit=5, popularity=None):
+        """Terms within the edit budget of ``term`` as ``[(term, distance)]``, closest first."""
+        edits = max_edits(term)
+        if not edits:
+            return []
+        grams = trigrams(term)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self.terms.get(gram, ()):
+                shared[candidate] += 1
+        # Each edit breaks at most four trigrams, so fewer shared ones rule a candidate out.
+        required = max(1, len(grams) - 4 * edits)
+        matches = []
+        for candidate, count in shared.items():
+            if count >= required and candidate != term:
+                distance = edit_distance(term, candidate, edits)
+                if distance <= edits:
+                    matches.append((candidate, distance))
+        matches.sort(key=lambda match: (match[1], -popularity(match[0]) if popularity else 0))
+        return matches[:limit]
+
+
+def _as_aware(value):
+    if not isinstance(value, datetime):
+        return EPOCH
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+# ------------------ INVERTED INDEX ------------------
+class SearchIndex:
+    """In-memory BM25 index over the searchable text fields of active items."""
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {item_id: weighted term frequency}
+        self.vocabulary = TrigramIndex()   # typo correction for terms missing from postings
+        self.doc_terms = {}                # item_id -> terms, needed for removal
+        self.doc_len = {}
+        self.doc_meta = {}                 # item_id -> (type, category, created_at)
+        self.total_len = 0.0
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def __contains__(self, item_id):
+        return item_id in self.doc_len
+
+    def add(self, item):
+        item_id = item["id"]
+        if item_id in self.doc_len:
+            self.remove(item_id)
+
+        weighted_tf = defaultdict(float)
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(item.get(field)):
+                weighted_tf[term] += weight
+                length += weight
+
+        for term, tf in weighted_tf.items():
+            if term not in self.postings:
+                self.vocabulary.add(term)
+            self.postings[term][item_id] = tf
+        self.doc_terms[item_id] = tuple(weighted_tf)
+        self.doc_len[item_id] = length
+        self.doc_meta[item_id] = (item.get("type"), item.get("category"), _as_aware(item.get("created_at")))
+        self.total_len += length
+
+    def remove(self, item_id):
+        if item_id not in self.doc_len:
+            return
+        for term in self.doc_terms.pop(item_id):
+            docs = self.postings[term]
+            docs.pop(item_id, None)
+            if not docs:
+                del self.postings[term]
+                self.vocabulary.discard(term)
+        self.total_len -= self.doc_len.pop(item_id)
+        del self.doc_meta[item_id]
+
+    def clear(self):
+        self.postings.clear()
+        self.vocabulary.clear()
+        self.doc_terms.clear()
+        self.doc_len.clear()
+        self.doc_meta.clear()
+        self.total_len = 0.0
+
+    def similar_terms(self, term, limit=5):
+        return self.vocabulary.similar(term, limit, popularity=lambda t: len(self.postings[t]))
+
+    def expand(self, term, fuzzy=True):
+        if term in self.postings or not fuzzy:
+            return [(term, 1.0)]
+        return [(candidate, FUZZY_PENALTY ** distance) for candidate, distance in self.similar_terms(term)]
+
+    def search(self, query, type=None, category=None, skip=0, limit=50, fuzzy=True):
+        """Return ``(total_matches, [(item_id, score), ...])`` for one page of results.
+
+        With ``fuzzy``, query terms missing from the vocabulary are replaced by their
+        closest known spellings at a per-edit score penalty.
+        """
+        terms = set(tokenize(query))
+        n_docs = len(self.doc_len)
+        if not terms or not n_docs:
+            return 0, []
+
+        avg_len = self.total_len / n_docs or 1.0
+        scores = defaultdict(float)
+        for term in terms:
+            # Several corrections of one query term count once per item: the best one.
+            term_scores = {}
+            for variant, weight in self.expand(term, fuzzy):
+                docs = self.postings.get(variant)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for item_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_len[item_id] / avg_len)
+                    score = weight * idf * tf * (self.k1 + 1) / (tf + norm)
+                    if score > term_scores.get(item_id, 0.0):
+                        term_scores[item_id] = score
+            for item_id, score in term_scores.items():
+                scores[item_id] += score
+
+        if type or category:
+            for item_id in list(scores):
+                item_type, item_category, _ = self.doc_meta[item_id]
+                if (type and item_type != type) or (category and item_category != category):
+                    del scores[item_id]
+
+        # Newer posts win ties, which matters for short one-word queries.
+        page = heapq.nlargest(
+            skip + limit,
+            scores.items(),
+            key=lambda hit: (hit[1], self.doc_meta[hit[0]][2]),
+        )[skip:]
+        return len(scores), page
@@ -1,19 +1,47 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, UploadFile, File, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse, FileResponse, PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 import os
+import asyncio
 from contextlib import asynccontextmanager
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, ValidationError
+from typing import List, Literal, Optional, Union
 import uuid
+import base64
+import json
 from datetime import datetime, timezone, timedelta
 import jwt
+import orjson
 from passlib.context import CryptContext
 import re
+import zlib
+import hashlib
+from search_index import SearchIndex
+from suggest import SuggestIndex
+from geo_index import GeoIndex
+from matching import MatchEngine
+from database import SlowQueryMonitor, ensure_indexes
+from cache import TTLCache, ResponseCache
+from hashing import PasswordHasher, HasherOverloaded
+from stats import ItemStats, GLOBAL_SCOPE, user_scope
+from feed import FeedHub
+from images import ImageStore, InvalidImage, MEDIA_TYPES
+from replica import ActiveReplica
+from resync import IndexResync
+from archive import ItemArchiver, ARCHIVE_COLLECTION
+from alerts import SavedSearchIndex, AlertMatcher, has_criteria, UNREAD, READ
+from outbox import Outbox, LogTransport, SmtpTransport
+from engagement import EngagementCounters, VIEWS, CONTACTS
+from ratelimit import Rate, RateLimiter, ConcurrencyLimiter, AdmissionMiddleware, client_ip, report_untrusted_proxy
+import metrics
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -21,18 +49,124 @@ load_dotenv(ROOT_DIR / '.env')
 # --- MongoDB Connection (Initialized later via lifespan) ---
 client = None
 db = None
+slow_query_monitor = SlowQueryMonitor(threshold_ms=float(os.environ.get('SLOW_QUERY_MS', '100')))
+db_metrics = metrics.DbMetricsListener()
+
+# --- In-process indexes over active items and saved searches ---
+INDEX_PROJECTION = {"_id": 0, "id": 1, "type": 1, "category": 1, "title": 1,
+                    "description": 1, "location": 1, "color": 1, "created_at": 1,
+                    "latitude": 1, "longitude": 1}
+# Built on startup, then refreshed on this interval from the items created or changed
+# status since (other workers' writes) and rebuilt in full every INDEX_FULL_RESYNC_SECONDS;
+# 0 turns the background sync off, which is only correct when a single worker serves the API.
+index_resync = IndexResync(
+    resync_seconds=float(os.environ.get('INDEX_RESYNC_SECONDS', '30')),
+    full_resync_seconds=float(os.environ.get('INDEX_FULL_RESYNC_SECONDS', '21600')),
+)
+search_index, suggest_index, geo_index = index_resync.register(
+    "items", {"status": "active"}, INDEX_PROJECTION, SearchIndex, SuggestIndex, GeoIndex,
+    changed_fields=("created_at", "status_changed_at"))
+saved_search_index, = index_resync.register("saved_searches", {}, {"_id": 0}, SavedSearchIndex)
+match_engine = MatchEngine()
+feed_hub = FeedHub(
+    queue_size=int(os.environ.get('FEED_QUEUE_SIZE', '100')),
+    max_subscribers=int(os.environ.get('FEED_MAX_SUBSCRIBERS', '10000')),
+)
+image_store = ImageStore(
+    os.environ.get('UPLOAD_DIR', str(ROOT_DIR / 'uploads')),
+    max_bytes=int(os.environ.get('IMAGE_MAX_BYTES', str(10 * 1024 * 1024))),
+    workers=int(os.environ.get('IMAGE_WORKERS', '2')),
+)
+# Optional in-process copy of all active items that serves listing and detail reads
+HOT_REPLICA_ENABLED = os.environ.get('HOT_REPLICA', '0') == '1'
+# Each worker's copy picks up other workers' creates and status changes every
+# HOT_REPLICA_REFRESH_SECONDS and is rebuilt in full every HOT_REPLICA_RESYNC_SECONDS.
+hot_replica = ActiveReplica(
+    resync_seconds=float(os.environ.get('HOT_REPLICA_RESYNC_SECONDS', '300')),
+    refresh_seconds=float(os.environ.get('HOT_REPLICA_REFRESH_SECONDS', '15')),
+)
+# Contact notifications go through a persistent outbox; SMTP_HOST switches from logging to real mail
+if os.environ.get('SMTP_HOST'):
+    notification_transport = SmtpTransport(
+        os.environ['SMTP_HOST'],
+        port=int(os.environ.get('SMTP_PORT', '25')),
+        sender=os.environ.get('SMTP_SENDER', 'no-reply@foundloss.local'),
+        username=os.environ.get('SMTP_USERNAME'),
+        password=os.environ.get('SMTP_PASSWORD'),
+        starttls=os.environ.get('SMTP_STARTTLS', '0') == '1',
+    )
+else:
+    notification_transport = LogTransport()
+outbox = Outbox(
+    notification_transport,
+    workers=int(os.environ.get('OUTBOX_WORKERS', '2')),
+    batch_size=int(os.environ.get('OUTBOX_BATCH_SIZE', '20')),
+    max_attempts=int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '6')),
+    observer=metrics.observe_outbox_delivery,
+)
+# Saved-search alerts are emailed through the outbox
+alert_matcher = AlertMatcher(saved_search_index, outbox)
+# Item views and contacts are summed in memory and written back in one bulk_write per interval
+engagement = EngagementCounters(
+    flush_seconds=float(os.environ.get('ENGAGEMENT_FLUSH_SECONDS', '5')),
+    max_items=int(os.environ.get('ENGAGEMENT_MAX_ITEMS', '10000')),
+)
+# Identical contact messages from one sender (signed-in user or client IP) are collapsed within this window
+CONTACT_DEDUP_SECONDS = int(os.environ.get('CONTACT_DEDUP_SECONDS', '600'))
+item_stats = ItemStats(
+    reconcile_seconds=float(os.environ.get('STATS_RECONCILE_SECONDS', '3600')),
+    sources=("items", ARCHIVE_COLLECTION),
+)
+
+def index_item(item):
+    index_resync.add("items", item)
+
+def unindex_item(item_id):
+    index_resync.remove("items", item_id)
+
+async def load_indexes():
+    await index_resync.rebuild(db, "items")
+    print(f"🔎 Item indexes loaded ({len(search_index)} items, {len(geo_index)} with coordinates)")
+
+async def load_saved_searches():
+    await index_resync.rebuild(db, "saved_searches")
+    print(f"🔔 Saved searches loaded ({len(saved_search_index)})")
 
 # ------------------ LIFESPAN (replaces on_event) ------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global client, db
     mongo_url = os.environ['MONGO_URL']
-    client = AsyncIOMotorClient(mongo_url)
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[slow_query_monitor, db_metrics])
     db = client[os.environ['DB_NAME']]
+    slow_query_monitor.attach(db, asyncio.get_running_loop())
     print("✅ MongoDB connected")
+    await ensure_indexes(db)
+    await load_indexes()
+    await load_saved_searches()
+    index_resync.start(db)
+    match_engine.start(db)
+    alert_matcher.start(db)
+    outbox.start(db)
+    engagement.start(db)
+    if HOT_REPLICA_ENABLED:
+        await hot_replica.resync(db, ITEM_PROJECTION)
+        hot_replica.start(db, ITEM_PROJECTION)
+    item_stats.start(db)
+    item_archiver.start(db)
 
     yield  # <-- App runs here
 
+    await index_resync.stop()
+    await match_engine.stop()
+    await alert_matcher.stop()
+    await outbox.stop()
+    await engagement.stop()
+    await hot_replica.stop()
+    await item_stats.stop()
+    await item_archiver.stop()
+    password_hasher.shutdown()
+    image_store.shutdown()
     client.close()
     print("🛑 MongoDB connection closed")
 
@@ -44,11 +178,52 @@ api_router = APIRouter(prefix="/api")
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '4')),
+    max_queue=int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '64')),
+    observer=metrics.observe_password_hash,
+)
 SECRET_KEY = "your-secret-key-here-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Auth caches: decoded token -> user id, and user id -> User record
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', '10000'))
+AUTH_CACHE_TTL = float(os.environ.get('AUTH_CACHE_TTL', '60'))
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+# Rate limits ("requests/seconds") for the endpoints that hash passwords or are unauthenticated
+RATE_LIMITS_ENABLED = os.environ.get('RATE_LIMITS', '1') == '1'
+# The *_ip limits key on the client address. Behind an ingress or load balancer every request
+# comes from the proxy, so set TRUSTED_PROXY_COUNT to the number of proxies in front of the API
+# (1 for a single ingress). The client is then the hop that many places from the right of
+# X-Forwarded-For, the one the outermost proxy appended; hops further left are client-supplied
+# and ignored. At 0 those limits are shared by all clients behind a proxy and an error is logged
+# on the first forwarded request. Keep it 0 when clients can reach the API directly, since they
+# could then forge the header. TRUST_PROXY_HEADERS=1 is the older spelling of a count of 1.
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', os.environ.get('TRUST_PROXY_HEADERS', '0')))
+rate_limiter = RateLimiter({
+    "login_ip": Rate.parse(os.environ.get('RATE_LIMIT_LOGIN_IP', '30/60')),
+    "login_account": Rate.parse(os.environ.get('RATE_LIMIT_LOGIN_ACCOUNT', '10/60')),
+    "register_ip": Rate.parse(os.environ.get('RATE_LIMIT_REGISTER_IP', '10/60')),
+    "contact_ip": Rate.parse(os.environ.get('RATE_LIMIT_CONTACT_IP', '20/60')),
+})
+admission = ConcurrencyLimiter(
+    max_in_flight=int(os.environ.get('MAX_IN_FLIGHT_REQUESTS', '512')),
+    retry_after=int(os.environ.get('OVERLOAD_RETRY_AFTER', '1')),
+)
+
+# Response cache for anonymous item reads, invalidated from the write paths
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get('RESPONSE_CACHE_SIZE', '2048')),
+    ttl=float(os.environ.get('RESPONSE_CACHE_TTL', '30')),
+)
+RESPONSE_CACHE_CONTROL = f"public, max-age={os.environ.get('RESPONSE_CACHE_MAX_AGE', '5')}, must-revalidate"
+
 # ------------------ MODELS ------------------
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -87,10 +262,13 @@ class Item(BaseModel):
     contact_phone: str
     image_url: Optional[str] = None
     status: str = "active"
+    view_count: int = 0
+    contact_count: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ItemCreate(BaseModel):
-    type: str
+    # Each type becomes a counter field in the stats documents, so only these are accepted.
+    type: Literal["lost", "found"]
     title: str
     description: str
     category: str
@@ -102,17 +280,120 @@ class ItemCreate(BaseModel):
     contact_phone: str
     image_url: Optional[str] = None
 
+class ItemPage(BaseModel):
+    items: List[Item]
+    next_cursor: Optional[str] = None
+
+class Suggestion(BaseModel):
+    text: str
+    field: str
+    count: int
+
+class SearchResults(BaseModel):
+    total: int
+    skip: int
+    limit: int
+    items: List[Item]
+
+class NearbyItem(Item):
+    distance_km: float
+
+class ItemMatch(BaseModel):
+    item: Item
+    score: float
+    text_similarity: float
+    same_category: bool
+    same_color: bool
+    distance_km: Optional[float] = None
+
+# Lean read path: project exactly the Item fields and serialize the raw documents.
+ITEM_PROJECTION = {"_id": 0, **{field: 1 for field in Item.model_fields}}
+ITEM_DEFAULTS = {"latitude": None, "longitude": None, "image_url": None, "status": "active",
+                 "view_count": 0, "contact_count": 0}
+
+def lean_item(doc: dict) -> dict:
+    return doc if len(doc) == len(ITEM_PROJECTION) - 1 else {**ITEM_DEFAULTS, **doc}
+
+class BulkItemResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkInsertResponse(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BulkItemResult]
+
+class ItemBatchRequest(BaseModel):
+    ids: List[str]
+
+class ItemBatchResponse(BaseModel):
+    items: List[Item]
+    missing: List[str]
+
+class SavedSearchCreate(BaseModel):
+    type: Optional[str] = None
+    category: Optional[str] = None
+    color: Optional[str] = None
+    keywords: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    radius_km: Optional[float] = None
+
+class SavedSearch(SavedSearchCreate):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    user_id: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class AlertItem(BaseModel):
+    id: str
+    type: str
+    title: str
+    category: str
+    color: str
+    location: str
+    created_at: datetime
+
+class Alert(BaseModel):
+    id: str
+    saved_search_id: str
+    item_id: str
+    item: AlertItem
+    status: str
+    created_at: datetime
+
 class ContactOwner(BaseModel):
     item_id: str
     contact_method: str
     message: str
 
 # ------------------ UTILS ------------------
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except HasherOverloaded:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+async def get_password_hash(password):
+    try:
+        return await password_hasher.hash(password)
+    except HasherOverloaded:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+async def enforce_rate_limit(rule, key):
+    if not RATE_LIMITS_ENABLED:
+        return
+    retry_after = await rate_limiter.check(rule, key)
+    if retry_after:
+        metrics.RATE_LIMITED.inc(rule)
+        raise HTTPException(status_code=429, detail="Too many requests, please slow down",
+                            headers={"Retry-After": str(retry_after)})
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+def rate_limit_client(rule):
+    async def dependency(request: Request):
+        await enforce_rate_limit(rule, client_ip(request, TRUSTED_PROXY_COUNT))
+    return Depends(dependency)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -121,28 +402,168 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def invalidate_user(user_id: str):
+    # Call whenever a user record is modified or deleted so the next request re-reads it.
+    user_cache.pop(user_id)
+
+def decode_token(token: str) -> str:
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
-    
-    user = await db.users.find_one({"id": user_id})
+    # Never cache a token past its own expiry.
+    exp = payload.get("exp")
+    token_cache.set(token, user_id, ttl=None if exp is None else exp - datetime.now(timezone.utc).timestamp())
+    return user_id
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    user_id = decode_token(credentials.credentials)
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return User(**user)
+    user = User(**user)
+    user_cache.set(user_id, user)
+    return user
+
+def optional_user_id(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)) -> Optional[str]:
+    # For endpoints open to everyone that still want to know a signed-in caller.
+    if credentials is None:
+        return None
+    try:
+        return decode_token(credentials.credentials)
+    except HTTPException:
+        return None
+
+def encode_cursor(item):
+    created_at = item["created_at"]
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    payload = {"t": int(created_at.timestamp() * 1000), "id": item["id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def cursor_key(created_at: datetime, item_id: str):
+    return round(created_at.timestamp() * 1000), item_id
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromtimestamp(payload["t"] / 1000, tz=timezone.utc)
+        return created_at, str(payload["id"])
+    except (ValueError, KeyError, TypeError, OverflowError, OSError):
+        # Out-of-range timestamps overflow datetime rather than failing to parse.
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def merge_newest(pages: list, limit: int) -> list:
+    # Merge newest-first lists from several collections; an item briefly in two keeps its first copy.
+    if len(pages) == 1:
+        return pages[0][:limit]
+    seen = set()
+    docs = [doc for page in pages for doc in page if not (doc["id"] in seen or seen.add(doc["id"]))]
+    docs.sort(key=lambda doc: (doc["created_at"], doc["id"]), reverse=True)
+    return docs[:limit]
+
+async def fetch_item_page(filter_dict: dict, cursor: str, limit: int, collections: tuple = ("items",)):
+    # Keyset pagination on (created_at, id): every page is an index range scan, however deep.
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        filter_dict = {**filter_dict, "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": last_id}},
+        ]}
+    pages = []
+    for collection in collections:
+        cursor = db[collection].find(filter_dict, ITEM_PROJECTION).sort([("created_at", -1), ("id", -1)]).limit(limit + 1)
+        pages.append(await cursor.to_list(limit + 1))
+    docs = merge_newest(pages, limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return {"items": [lean_item(doc) for doc in docs[:limit]], "next_cursor": next_cursor}
+
+def render_json(content) -> bytes:
+    # Plain dicts/lists go straight through orjson; models fall back to FastAPI's encoder.
+    return orjson.dumps(content, default=jsonable_encoder)
+
+def listing_tag(type: Optional[str], category: Optional[str]):
+    return f"list:{type or '*'}:{category or '*'}"
+
+def invalidate_item_responses(item: dict):
+    # A change to one item can only affect listings whose filters it satisfies.
+    type, category = item.get("type"), item.get("category")
+    response_cache.invalidate(
+        f"item:{item['id']}",
+        listing_tag(None, None), listing_tag(type, None),
+        listing_tag(None, category), listing_tag(type, category),
+    )
+
+async def cached_response(request: Request, key: tuple, tags: list, loader):
+    entry = await response_cache.get_or_load(key, tags, loader)
+    headers = {"ETag": entry.etag, "Cache-Control": RESPONSE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if entry.etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def sse_frame(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+def after_item_created(item: dict):
+    index_item(item)
+    if HOT_REPLICA_ENABLED:
+        hot_replica.add(item)
+    invalidate_item_responses(item)
+    match_engine.submit(item["id"])
+    alert_matcher.submit(item)
+    feed_hub.publish(sse_frame("created", lean_item({k: v for k, v in item.items() if k != "_id"})),
+                     item.get("type"), item.get("category"))
+
+def after_status_change(item: dict, status: str):
+    invalidate_item_responses(item)
+    feed_hub.publish(sse_frame("status", {"id": item["id"], "status": status}), item.get("type"), item.get("category"))
+    if status == "active":
+        index_item({**item, "status": status})
+        match_engine.submit(item["id"])
+    else:
+        unindex_item(item["id"])
+    if HOT_REPLICA_ENABLED:
+        if status == "active":
+            hot_replica.add({**item, "status": status})
+        else:
+            hot_replica.remove(item["id"])
+
+async def after_items_expired(items: list):
+    await item_stats.record_status_changes(db, items, "active", "expired")
+    for item in items:
+        after_status_change(item, "expired")
+
+# Lifecycle: stale active items expire, inactive ones move to the archive collection
+item_archiver = ItemArchiver(
+    max_active_days=float(os.environ.get('ITEM_MAX_ACTIVE_DAYS', '90')),
+    archive_after_days=float(os.environ.get('ARCHIVE_AFTER_DAYS', '7')),
+    batch_size=int(os.environ.get('ARCHIVE_BATCH_SIZE', '500')),
+    interval_seconds=float(os.environ.get('ARCHIVE_INTERVAL_SECONDS', '600')),
+    on_expired=after_items_expired,
+)
 
 # ------------------ ROUTES ------------------
-@api_router.post("/auth/register", response_model=Token)
+@api_router.post("/auth/register", response_model=Token, dependencies=[rate_limit_client("register_ip")])
 async def register(user_data: UserCreate):
     existing_user = await db.users.find_one({"email": user_data.email})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     user_dict = user_data.dict()
     del user_dict["password"]
     user = User(**user_dict)
@@ -154,10 +575,11 @@ async def register(user_data: UserCreate):
     access_token = create_access_token(data={"sub": user.id})
     return Token(access_token=access_token, token_type="bearer", user=user)
 
-@api_router.post("/auth/login", response_model=Token)
+@api_router.post("/auth/login", response_model=Token, dependencies=[rate_limit_client("login_ip")])
 async def login(user_data: UserLogin):
+    await enforce_rate_limit("login_account", user_data.email.lower())
     user = await db.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user["password"]):
+    if not user or not await verify_password(user_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     user_obj = User(**user)
@@ -175,39 +597,451 @@ async def create_item(item_data: ItemCreate, current_user: User = Depends(get_cu
     item = Item(**item_dict)
     
     await db.items.insert_one(item.dict())
+    after_item_created(item.dict())
+    await item_stats.record_created(db, [item.dict()])
     return item
 
-@api_router.get("/items", response_model=List[Item])
-async def get_items(type: Optional[str] = None, category: Optional[str] = None, skip: int = 0, limit: int = 50):
+BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', '5000'))
+BULK_MAX_BYTES = int(os.environ.get('BULK_MAX_BYTES', str(16 * 1024 * 1024)))
+BULK_MAX_LINE_BYTES = 64 * 1024
+BULK_CHUNK_SIZE = 500
+
+def validation_message(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors())
+
+def bulk_too_large(detail: str):
+    return HTTPException(status_code=413, detail=detail)
+
+async def iter_body_chunks(request: Request):
+    # Content-Length rejects honest oversized uploads up front; the count covers chunked ones.
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > BULK_MAX_BYTES:
+        raise bulk_too_large(f"Body exceeds {BULK_MAX_BYTES} bytes")
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > BULK_MAX_BYTES:
+            raise bulk_too_large(f"Body exceeds {BULK_MAX_BYTES} bytes")
+        yield chunk
+
+async def iter_bulk_rows(request: Request):
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        # Split lines as the body arrives; only the unfinished tail is carried between chunks.
+        tail = bytearray()
+        async for chunk in iter_body_chunks(request):
+            tail += chunk
+            start = 0
+            while (end := tail.find(b"\n", start)) != -1:
+                line = bytes(tail[start:end])
+                start = end + 1
+                if line.strip():
+                    yield line
+            del tail[:start]
+            if len(tail) > BULK_MAX_LINE_BYTES:
+                raise bulk_too_large(f"NDJSON lines are limited to {BULK_MAX_LINE_BYTES} bytes")
+        if tail.strip():
+            yield bytes(tail)
+        return
+
+    body = bytearray()
+    async for chunk in iter_body_chunks(request):
+        body += chunk
+    try:
+        rows = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if len(rows) > BULK_MAX_ROWS:
+        raise bulk_too_large(f"At most {BULK_MAX_ROWS} items per request")
+    for row in rows:
+        yield row
+
+async def insert_bulk_chunk(docs: list, indexes: list, results: list):
+    failed = {}
+    try:
+        await db.items.insert_many(docs, ordered=False)
+    except BulkWriteError as exc:
+        for err in exc.details.get("writeErrors", []):
+            failed[err["index"]] = err.get("errmsg", "write failed")
+    inserted = []
+    for position, (doc, index) in enumerate(zip(docs, indexes)):
+        doc.pop("_id", None)
+        if position in failed:
+            results.append(BulkItemResult(index=index, ok=False, error=failed[position]))
+        else:
+            after_item_created(doc)
+            inserted.append(doc)
+            results.append(BulkItemResult(index=index, ok=True, id=doc["id"]))
+    await item_stats.record_created(db, inserted)
+
+@api_router.post("/items/bulk", response_model=BulkInsertResponse)
+async def create_items_bulk(request: Request, current_user: User = Depends(get_current_user)):
+    results = []
+    docs, indexes = [], []
+    index = -1
+    # Every row is read and validated before the first write, so a 413 always means nothing
+    # was stored and the client can retry without creating duplicates.
+    async for raw in iter_bulk_rows(request):
+        index += 1
+        if index >= BULK_MAX_ROWS:
+            raise bulk_too_large(f"At most {BULK_MAX_ROWS} items per request")
+        try:
+            row = orjson.loads(raw) if isinstance(raw, bytes) else raw
+            if not isinstance(row, dict):
+                raise ValueError("row must be a JSON object")
+            item = Item(**ItemCreate(**row).dict(), user_id=current_user.id)
+        except ValidationError as exc:
+            results.append(BulkItemResult(index=index, ok=False, error=validation_message(exc)))
+            continue
+        except ValueError as exc:
+            results.append(BulkItemResult(index=index, ok=False, error=str(exc)))
+            continue
+        docs.append(item.dict())
+        indexes.append(index)
+
+    for start in range(0, len(docs), BULK_CHUNK_SIZE):
+        await insert_bulk_chunk(docs[start:start + BULK_CHUNK_SIZE], indexes[start:start + BULK_CHUNK_SIZE], results)
+
+    results.sort(key=lambda r: r.index)
+    inserted = sum(1 for r in results if r.ok)
+    return BulkInsertResponse(inserted=inserted, failed=len(results) - inserted, results=results)
+
+BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', '100'))
+
+@api_router.post("/items/batch", response_model=ItemBatchResponse)
+async def get_items_batch(batch: ItemBatchRequest):
+    ids = list(dict.fromkeys(batch.ids))
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_IDS} ids per request")
+
+    found = {}
+    if HOT_REPLICA_ENABLED and hot_replica.ready:
+        for item_id in ids:
+            doc = hot_replica.get(item_id)
+            if doc is not None:
+                found[item_id] = doc
+    # One $in per collection for whatever the replica could not answer; archived items stay reachable.
+    for collection in ("items", ARCHIVE_COLLECTION):
+        pending = [item_id for item_id in ids if item_id not in found]
+        if not pending:
+            break
+        async for doc in db[collection].find({"id": {"$in": pending}}, ITEM_PROJECTION):
+            found[doc["id"]] = lean_item(doc)
+
+    content = {
+        "items": [found[item_id] for item_id in ids if item_id in found],
+        "missing": [item_id for item_id in ids if item_id not in found],
+    }
+    return Response(content=render_json(content), media_type="application/json")
+
+async def search_items(q: str, type: Optional[str], category: Optional[str], skip: int, limit: int, fuzzy: bool = True):
+    total, hits = search_index.search(q, type=type, category=category, skip=skip, limit=limit, fuzzy=fuzzy)
+    ids = [item_id for item_id, _ in hits]
+    if not ids:
+        return total, []
+    docs = await db.items.find({"id": {"$in": ids}, "status": "active"}).to_list(len(ids))
+    by_id = {doc["id"]: doc for doc in docs}
+    return total, [Item(**by_id[item_id]) for item_id in ids if item_id in by_id]
+
+async def list_items(type: Optional[str], category: Optional[str], q: Optional[str], cursor: Optional[str], skip: int, limit: int):
+    if q:
+        if cursor is not None:
+            raise HTTPException(status_code=400, detail="cursor cannot be combined with q")
+        _, items = await search_items(q, type, category, skip, limit)
+        return items
+
+    if HOT_REPLICA_ENABLED and hot_replica.ready:
+        if cursor is None:
+            return hot_replica.page(type, category, skip, limit)
+        limit = max(1, min(limit, 100))
+        before = cursor_key(*decode_cursor(cursor)) if cursor else None
+        docs = hot_replica.page(type, category, 0, limit + 1, before=before)
+        next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        return {"items": docs[:limit], "next_cursor": next_cursor}
+
     filter_dict = {"status": "active"}
     if type:
         filter_dict["type"] = type
     if category:
         filter_dict["category"] = category
+
+    # Passing cursor (empty for the first page) opts into keyset pagination.
+    if cursor is not None:
+        return await fetch_item_page(filter_dict, cursor, max(1, min(limit, 100)))
     
-    items = await db.items.find(filter_dict).skip(skip).limit(limit).sort("created_at", -1).to_list(limit)
-    return [Item(**item) for item in items]
+    # id breaks created_at ties, the same order the hot replica and the cursor pages use.
+    items = await db.items.find(filter_dict, ITEM_PROJECTION).skip(skip).limit(limit).sort([("created_at", -1), ("id", -1)]).to_list(limit)
+    return [lean_item(item) for item in items]
+
+@api_router.get("/items", response_model=Union[ItemPage, List[Item]])
+async def get_items(request: Request, type: Optional[str] = None, category: Optional[str] = None, q: Optional[str] = None, cursor: Optional[str] = None, skip: int = 0, limit: int = 50):
+    async def load():
+        return render_json(await list_items(type, category, q, cursor, skip, limit))
+    key = ("items", type, category, q, cursor, skip, limit)
+    return await cached_response(request, key, [listing_tag(type, category)], load)
+
+@api_router.get("/items/search", response_model=SearchResults)
+async def search(q: str, type: Optional[str] = None, category: Optional[str] = None, skip: int = 0, limit: int = 20, fuzzy: bool = True):
+    limit = min(limit, 100)
+    total, items = await search_items(q, type, category, skip, limit, fuzzy)
+    return SearchResults(total=total, skip=skip, limit=limit, items=items)
+
+@api_router.get("/items/suggest", response_model=List[Suggestion])
+async def suggest(prefix: str, limit: int = 8):
+    # Served entirely from memory so it can run on every keystroke.
+    suggestions = suggest_index.suggest(prefix[:100], limit=max(1, min(limit, 20)))
+    return Response(content=render_json(suggestions), media_type="application/json")
+
+@api_router.get("/items/nearby", response_model=List[NearbyItem])
+async def get_nearby_items(lat: float, lng: float, radius_km: float = 5.0, type: Optional[str] = None, category: Optional[str] = None, limit: int = 50):
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+    if radius_km <= 0:
+        raise HTTPException(status_code=400, detail="radius_km must be positive")
+
+    hits = geo_index.nearby(lat, lng, min(radius_km, 100.0), type=type, category=category, limit=min(limit, 200))
+    if not hits:
+        return []
+    ids = [item_id for item_id, _ in hits]
+    docs = await db.items.find({"id": {"$in": ids}, "status": "active"}).to_list(len(ids))
+    by_id = {doc["id"]: doc for doc in docs}
+    return [NearbyItem(**by_id[item_id], distance_km=round(distance, 3)) for item_id, distance in hits if item_id in by_id]
+
+EXPORT_BATCH_SIZE = 500
+
+async def export_ndjson(filter_dict: dict, compress: bool):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    cursor = db.items.find(filter_dict, ITEM_PROJECTION).sort([("created_at", 1), ("id", 1)]).batch_size(EXPORT_BATCH_SIZE)
+    chunk = []
+    async for doc in cursor:
+        chunk.append(orjson.dumps(lean_item(doc)))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            data = b"\n".join(chunk) + b"\n"
+            chunk = []
+            yield compressor.compress(data) if compressor else data
+    if chunk:
+        data = b"\n".join(chunk) + b"\n"
+        yield compressor.compress(data) if compressor else data
+    if compressor:
+        yield compressor.flush()
+
+@api_router.get("/items/export")
+async def export_items(type: Optional[str] = None, category: Optional[str] = None, status: Optional[str] = "active", since: Optional[datetime] = None, gzip: bool = False, current_user: User = Depends(get_current_user)):
+    filter_dict = {}
+    if status and status != "all":
+        filter_dict["status"] = status
+    if type:
+        filter_dict["type"] = type
+    if category:
+        filter_dict["category"] = category
+    if since:
+        filter_dict["created_at"] = {"$gte": since}
+
+    headers = {"Content-Disposition": 'attachment; filename="items.ndjson%s"' % (".gz" if gzip else "")}
+    return StreamingResponse(
+        export_ndjson(filter_dict, gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers=headers,
+    )
+
+FEED_HEARTBEAT_SECONDS = 15
+
+async def feed_events(request: Request, subscriber):
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), FEED_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n"
+                continue
+            if subscriber.lagged:
+                # Events were dropped for this client; it should refetch the listing.
+                subscriber.lagged = False
+                yield sse_frame("resync", {"dropped": subscriber.dropped})
+            yield frame
+    finally:
+        feed_hub.unsubscribe(subscriber)
+
+@api_router.get("/items/stream")
+async def stream_items(request: Request, type: Optional[str] = None, category: Optional[str] = None):
+    subscriber = feed_hub.subscribe(type, category)
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many feed subscribers", headers={"Retry-After": "30"})
+    return StreamingResponse(
+        feed_events(request, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/items/popular", response_model=List[Item])
+async def get_popular_items(request: Request, type: Optional[str] = None, category: Optional[str] = None, limit: int = 20):
+    limit = max(1, min(limit, 100))
+    async def load():
+        filter_dict = {"status": "active"}
+        if type:
+            filter_dict["type"] = type
+        if category:
+            filter_dict["category"] = category
+        docs = await db.items.find(filter_dict, ITEM_PROJECTION).sort(
+            [("view_count", -1), ("created_at", -1)]).limit(limit).to_list(limit)
+        return render_json([lean_item(doc) for doc in docs])
+    key = ("popular", type, category, limit)
+    return await cached_response(request, key, [listing_tag(type, category)], load)
 
 @api_router.get("/items/{item_id}", response_model=Item)
-async def get_item(item_id: str):
-    item = await db.items.find_one({"id": item_id})
+async def get_item(request: Request, item_id: str):
+    async def load():
+        if HOT_REPLICA_ENABLED and hot_replica.ready:
+            doc = hot_replica.get(item_id)
+            if doc is not None:
+                return render_json(doc)
+        item = await db.items.find_one({"id": item_id}) or await item_archiver.find(db, item_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return render_json(Item(**item))
+    response = await cached_response(request, ("item", item_id), [f"item:{item_id}"], load)
+    # Counted only once the item is known to exist, so made-up ids cannot fill the counter buffer.
+    engagement.incr(item_id, VIEWS)
+    return response
+
+@api_router.get("/items/{item_id}/matches", response_model=List[ItemMatch])
+async def get_item_matches(item_id: str):
+    item = await db.items.find_one({"id": item_id}, {"_id": 0, "id": 1})
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    return Item(**item)
 
-@api_router.get("/my-items", response_model=List[Item])
-async def get_my_items(current_user: User = Depends(get_current_user)):
-    items = await db.items.find({"user_id": current_user.id}).sort("created_at", -1).to_list(100)
-    return [Item(**item) for item in items]
+    record = await db.matches.find_one({"item_id": item_id})
+    matches = record["matches"] if record else []
+    if not matches:
+        return []
+
+    docs = await db.items.find({"id": {"$in": [m["item_id"] for m in matches]}, "status": "active"}).to_list(len(matches))
+    by_id = {doc["id"]: doc for doc in docs}
+    return [
+        ItemMatch(item=Item(**by_id[m["item_id"]]), **{k: v for k, v in m.items() if k != "item_id"})
+        for m in matches if m["item_id"] in by_id
+    ]
+
+@api_router.get("/my-items", response_model=Union[ItemPage, List[Item]])
+async def get_my_items(cursor: Optional[str] = None, limit: int = 50, archived: Optional[bool] = None,
+                       current_user: User = Depends(get_current_user)):
+    # Resolved items move to the archive after a while; by default the owner sees both.
+    if archived is None:
+        collections = ("items", ARCHIVE_COLLECTION)
+    else:
+        collections = (ARCHIVE_COLLECTION if archived else "items",)
+    if cursor is not None:
+        page = await fetch_item_page({"user_id": current_user.id}, cursor, max(1, min(limit, 100)), collections)
+        return Response(content=render_json(page), media_type="application/json")
+    pages = [await db[collection].find({"user_id": current_user.id}, ITEM_PROJECTION).sort("created_at", -1).to_list(100)
+             for collection in collections]
+    return Response(content=render_json([lean_item(item) for item in merge_newest(pages, 100)]), media_type="application/json")
+
+MAX_SAVED_SEARCHES = int(os.environ.get('MAX_SAVED_SEARCHES', '20'))
+MAX_ALERT_RADIUS_KM = 50.0
+
+@api_router.post("/saved-searches", response_model=SavedSearch)
+async def create_saved_search(search_data: SavedSearchCreate, current_user: User = Depends(get_current_user)):
+    if search_data.type is not None and search_data.type not in ("lost", "found"):
+        raise HTTPException(status_code=400, detail="type must be 'lost' or 'found'")
+    if search_data.radius_km is not None:
+        if search_data.latitude is None or search_data.longitude is None:
+            raise HTTPException(status_code=400, detail="radius_km needs latitude and longitude")
+        if not (-90 <= search_data.latitude <= 90 and -180 <= search_data.longitude <= 180):
+            raise HTTPException(status_code=400, detail="Invalid coordinates")
+        if not 0 < search_data.radius_km <= MAX_ALERT_RADIUS_KM:
+            raise HTTPException(status_code=400, detail=f"radius_km must be between 0 and {MAX_ALERT_RADIUS_KM:g}")
+    # Keywords that tokenize to nothing ("the", "!!") constrain nothing and don't count.
+    if not has_criteria(search_data.dict()):
+        raise HTTPException(status_code=400, detail="A saved search needs at least one criterion")
+    if await db.saved_searches.count_documents({"user_id": current_user.id}) >= MAX_SAVED_SEARCHES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SAVED_SEARCHES} saved searches per user")
 
-@api_router.post("/contact-owner")
-async def contact_owner(contact_data: ContactOwner):
+    search = SavedSearch(**search_data.dict(), user_id=current_user.id)
+    await db.saved_searches.insert_one(search.dict())
+    index_resync.add("saved_searches", search.dict())
+    return search
+
+@api_router.get("/saved-searches", response_model=List[SavedSearch])
+async def get_saved_searches(current_user: User = Depends(get_current_user)):
+    searches = await db.saved_searches.find({"user_id": current_user.id}, {"_id": 0}).sort("created_at", -1).to_list(MAX_SAVED_SEARCHES)
+    return [SavedSearch(**search) for search in searches]
+
+@api_router.delete("/saved-searches/{search_id}")
+async def delete_saved_search(search_id: str, current_user: User = Depends(get_current_user)):
+    result = await db.saved_searches.delete_one({"id": search_id, "user_id": current_user.id})
+    if not result.deleted_count:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    index_resync.remove("saved_searches", search_id)
+    return {"success": True, "message": "Saved search deleted"}
+
+@api_router.get("/alerts", response_model=List[Alert])
+async def get_alerts(limit: int = 50, current_user: User = Depends(get_current_user)):
+    limit = max(1, min(limit, 100))
+    alerts = await db.alerts.find({"user_id": current_user.id}, {"_id": 0}).sort("created_at", -1).to_list(limit)
+    return Response(content=render_json(alerts), media_type="application/json")
+
+@api_router.put("/alerts/{alert_id}/read")
+async def mark_alert_read(alert_id: str, current_user: User = Depends(get_current_user)):
+    result = await db.alerts.update_one(
+        {"id": alert_id, "user_id": current_user.id},
+        {"$set": {"status": READ, "read_at": datetime.now(timezone.utc)}},
+    )
+    if not result.matched_count:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return {"success": True, "message": "Alert marked as read"}
+
+@api_router.put("/alerts/read")
+async def mark_all_alerts_read(current_user: User = Depends(get_current_user)):
+    # Still-pending alerts keep their status so the matcher notifies them first.
+    result = await db.alerts.update_many(
+        {"user_id": current_user.id, "status": UNREAD},
+        {"$set": {"status": READ, "read_at": datetime.now(timezone.utc)}},
+    )
+    return {"success": True, "message": f"{result.modified_count} alerts marked as read"}
+
+@api_router.post("/contact-owner", dependencies=[rate_limit_client("contact_ip")])
+async def contact_owner(contact_data: ContactOwner, request: Request,
+                        idempotency_key: Optional[str] = Header(None, max_length=200),
+                        user_id: Optional[str] = Depends(optional_user_id)):
     item = await db.items.find_one({"id": contact_data.item_id})
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
+    engagement.incr(item["id"], CONTACTS)
+    if idempotency_key:
+        # Retries carrying the client's key are delivered once, whenever they arrive.
+        fingerprint = "key:" + hashlib.sha256(idempotency_key.encode()).hexdigest()[:32]
+    else:
+        # Otherwise only a resubmission from the same sender within the window is a duplicate;
+        # someone else sending the same words, or the same person later on, still gets through.
+        if user_id:
+            sender = f"user:{user_id}"
+        elif TRUSTED_PROXY_COUNT or "x-forwarded-for" not in request.headers:
+            sender = f"ip:{client_ip(request, TRUSTED_PROXY_COUNT)}"
+        else:
+            # Behind an untrusted proxy every caller shares one address; don't collapse strangers.
+            report_untrusted_proxy()
+            sender = f"once:{uuid.uuid4()}"
+        window = int(datetime.now(timezone.utc).timestamp()) // CONTACT_DEDUP_SECONDS
+        source = f"{sender}\n{contact_data.contact_method}\n{contact_data.message}"
+        fingerprint = f"{window}:" + hashlib.sha256(source.encode()).hexdigest()[:32]
+    notification_id = await outbox.enqueue(
+        db, "contact_owner", item["contact_email"],
+        subject=f"Someone responded to your {item['type']} item: {item['title']}",
+        body=(f"{contact_data.message}\n\n"
+              f"Preferred contact method: {contact_data.contact_method}\n"
+              f"Item: {item['title']} ({item['location']})"),
+        dedup_key=f"contact:{item['id']}:{fingerprint}",
+    )
     return {
         "success": True,
         "message": "Contact request processed",
+        "notification_id": notification_id,
         "contact_info": {
             "email": item["contact_email"],
             "phone": item["contact_phone"],
@@ -215,25 +1049,203 @@ async def contact_owner(contact_data: ContactOwner):
         }
     }
 
+# Statuses an owner may set; "expired" is reserved for the archiver. Each status is a
+# counter field in the stats documents, so free-form values are rejected.
+OWNER_STATUSES = ("active", "resolved")
+
 @api_router.put("/items/{item_id}/status")
 async def update_item_status(item_id: str, status: str, current_user: User = Depends(get_current_user)):
-    item = await db.items.find_one({"id": item_id, "user_id": current_user.id})
+    if status not in OWNER_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Status must be one of: {', '.join(OWNER_STATUSES)}")
+    # Returning the pre-update document gives the exact previous status for the counters.
+    # previous_status lets a concurrent stats reconciliation count the item as it was before.
+    item = await db.items.find_one_and_update(
+        {"id": item_id, "user_id": current_user.id},
+        [{"$set": {"previous_status": "$status", "status": status, "status_changed_at": datetime.now(timezone.utc)}}],
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not item and status == "active":
+        # /my-items lists archived items too, so their owners can bring them back.
+        item = await item_archiver.restore(db, item_id, current_user.id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found or not owned by you")
-    await db.items.update_one({"id": item_id}, {"$set": {"status": status}})
+    await item_stats.record_status_change(db, item, item.get("status"), status)
+    after_status_change(item, status)
     return {"success": True, "message": f"Item status updated to {status}"}
 
 @api_router.get("/")
 async def root():
     return {"message": "Found & Loss API v1.0"}
 
+@api_router.post("/images")
+async def upload_image(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+    data = await file.read(image_store.max_bytes + 1)
+    try:
+        manifest = await image_store.save(data)
+    except InvalidImage as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    digest = manifest["id"]
+    return {
+        **manifest,
+        "url": f"/api/images/{digest}/medium.webp",
+        "urls": {name: f"/api/images/{digest}/{name}" for name in manifest["variants"]},
+    }
+
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def parse_range(header: str, size: int):
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if start == "":
+        start, end = max(0, size - int(end)), size - 1
+    else:
+        start, end = int(start), min(int(end) if end else size - 1, size - 1)
+    if start > end or start >= size:
+        return None
+    return start, end
+
+def read_range(path: Path, start: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(length)
+
+@api_router.get("/images/{digest}/{filename}")
+async def get_image(request: Request, digest: str, filename: str):
+    path = image_store.path(digest, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # Content addressed: the bytes behind a URL never change.
+    etag = f'"{digest[:16]}-{filename}"'
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    media_type = MEDIA_TYPES[filename.rsplit(".", 1)[1]]
+    size = path.stat().st_size
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        body = await asyncio.to_thread(read_range, path, start, end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(content=body, status_code=206, media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+@api_router.get("/stats")
+async def get_stats():
+    return await item_stats.get(db, GLOBAL_SCOPE)
+
+@api_router.get("/stats/me")
+async def get_my_stats(current_user: User = Depends(get_current_user)):
+    return await item_stats.get(db, user_scope(current_user.id))
+
+# Internal state and query shapes: off unless DEBUG_ENDPOINTS=1, and then meant for a
+# private network only. Disabled endpoints answer 404 as if they did not exist.
+DEBUG_ENDPOINTS_ENABLED = os.environ.get('DEBUG_ENDPOINTS', '0') == '1'
+
+async def require_debug_endpoints():
+    if not DEBUG_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+debug_router = APIRouter(prefix="/debug", dependencies=[Depends(require_debug_endpoints)])
+
+@debug_router.get("/slow-queries")
+async def get_slow_queries():
+    return {"threshold_ms": slow_query_monitor.threshold_ms, "queries": slow_query_monitor.snapshot()}
+
+@debug_router.get("/auth")
+async def get_auth_stats():
+    return {
+        "password_hasher": password_hasher.stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "rate_limiter": {"enabled": RATE_LIMITS_ENABLED, **rate_limiter.stats()},
+        "admission": admission.stats(),
+    }
+
+@debug_router.get("/engagement")
+async def get_engagement_stats():
+    return engagement.stats()
+
+@debug_router.get("/outbox")
+async def get_outbox_stats():
+    return outbox.stats()
+
+@debug_router.get("/lifecycle")
+async def get_lifecycle_stats():
+    return item_archiver.stats()
+
+@debug_router.get("/replica")
+async def get_replica_report():
+    return {"enabled": HOT_REPLICA_ENABLED, "ready": hot_replica.ready, **hot_replica.memory_report()}
+
+@debug_router.get("/indexes")
+async def get_index_report():
+    return index_resync.stats()
+
 @api_router.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc)}
 
 # Include router
+api_router.include_router(debug_router)
 app.include_router(api_router)
 
+# ------------------ METRICS ------------------
+PASSWORD_HASH_QUEUE = metrics.registry.register(metrics.Gauge(
+    "password_hash_queue_depth", "Callers waiting for a password hashing slot."))
+PASSWORD_HASH_IN_FLIGHT = metrics.registry.register(metrics.Gauge(
+    "password_hash_in_flight", "Password hashes currently running."))
+CACHE_ENTRIES = metrics.registry.register(metrics.Gauge(
+    "cache_entries", "Entries held by in-process caches.", ("cache",)))
+FEED_SUBSCRIBERS = metrics.registry.register(metrics.Gauge(
+    "feed_subscribers", "Connected item feed subscribers."))
+SAVED_SEARCHES = metrics.registry.register(metrics.Gauge(
+    "saved_searches", "Saved searches indexed for alerts."))
+ALERT_QUEUE = metrics.registry.register(metrics.Gauge(
+    "alert_match_queue_depth", "New items waiting to be matched against saved searches."))
+OUTBOX_QUEUE = metrics.registry.register(metrics.Gauge(
+    "outbox_queue_depth", "Outbox messages waiting for delivery or in flight."))
+ENGAGEMENT_PENDING = metrics.registry.register(metrics.Gauge(
+    "engagement_pending_items", "Items with view/contact increments not yet written."))
+ADMITTED_IN_FLIGHT = metrics.registry.register(metrics.Gauge(
+    "admission_in_flight", "Requests holding an admission slot."))
+
+def collect_gauges():
+    PASSWORD_HASH_QUEUE.set(value=password_hasher.waiting)
+    PASSWORD_HASH_IN_FLIGHT.set(value=password_hasher.in_flight)
+    CACHE_ENTRIES.set("token", value=len(token_cache))
+    CACHE_ENTRIES.set("user", value=len(user_cache))
+    CACHE_ENTRIES.set("response", value=len(response_cache.entries))
+    CACHE_ENTRIES.set("hot_replica", value=len(hot_replica))
+    FEED_SUBSCRIBERS.set(value=feed_hub.count)
+    SAVED_SEARCHES.set(value=len(saved_search_index))
+    ALERT_QUEUE.set(value=alert_matcher.queue.qsize())
+    OUTBOX_QUEUE.set(value=outbox.depth)
+    ENGAGEMENT_PENDING.set(value=len(engagement.pending))
+    ADMITTED_IN_FLIGHT.set(value=admission.in_flight)
+
+metrics.registry.collectors.append(collect_gauges)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+# Long-lived streams and probes never count against the concurrency cap.
+app.add_middleware(
+    AdmissionMiddleware,
+    limiter=admission,
+    exempt=("/api/health", "/api/items/stream", "/metrics"),
+    observer=metrics.LOAD_SHED.inc,
+)
+app.add_middleware(metrics.MetricsMiddleware)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+DIMENSIONS = ("by_type", "by_category", "by_status", "by_type_status", "by_day")
+
+# Shares the stats collection; "global" and "user:<id>" never collide with it.
+LEASE_ID = "lease:reconcile"
+
+# Write counter on each scope document; not a statistic.
+VERSION_FIELD = "writes"
+
+
+def user_scope(user_id):
+    return f"user:{user_id}"
+
+
+COUNTER_KEY_MAX = 100
+
+
+def counter_key(value):
+    # Mongo field names cannot contain dots or NUL or start with '$'; keep free-form values short.
+    if value is None or value == "":
+        return "unknown"
+    return str(value).replace(".", "_").replace("\x00", "").lstrip("$")[:COUNTER_KEY_MAX] or "unknown"
+
+
+def day_key(created_at):
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc)
+        return created_at.strftime("%Y-%m-%d")
+    return "unknown"
+
+
+def item_counters(item, status=None, day=None):
+    status = counter_key(status or item.get("status") or "active")
+    item_type = counter_key(item.get("type"))
+    return {
+        f"by_type.{item_type}": 1,
+        f"by_category.{counter_key(item.get('category'))}": 1,
+        f"by_status.{status}": 1,
+        f"by_type_status.{item_type}.{status}": 1,
+        f"by_day.{day or day_key(item.get('created_at'))}": 1,
+    }
+
+
+class ItemStats:
+    """Global and per-user item counters maintained with $inc from the write paths.
+
+    Reads are a single lookup by _id. A periodic reconciliation recomputes every
+    counter from the source collections to correct any drift; one worker per interval
+    runs it, whoever claims the lease first.
+    """
+
+    def __init__(self, collection="stats", reconcile_seconds=3600.0, sources=("items",)):
+        self.collection = collection
+        self.sources = sources
+        self.reconcile_seconds = reconcile_seconds
+        self.last_reconciled_at = None
+        self._task = None
+
+    def _coll(self, db):
+        return db[self.collection]
+
+    async def record_created(self, db, items):
+        increments = defaultdict(lambda: defaultdict(int))
+        for item in items:
+            counters = item_counters(item)
+            for scope in (GLOBAL_SCOPE, user_scope(item["user_id"])):
+                increments[scope]["total"] += 1
+                for field, value in counters.items():
+                    increments[scope][field] += value
+        if increments:
+            await self._write(db, increments)
+
+    async def record_status_change(self, db, item, old_status, new_status):
+        await self.record_status_changes(db, [item], old_status, new_status)
+
+    async def record_status_changes(self, db, items, old_status, new_status):
+        if old_status == new_status:
+            return
+        old_status, new_status = counter_key(old_status), counter_key(new_status)
+        increments = defaultdict(lambda: defaultdict(int))
+        for item in items:
+            item_type = counter_key(item.get("type"))
+            for scope in (GLOBAL_SCOPE, user_scope(item["user_id"])):
+                inc = increments[scope]
+                inc[f"by_status.{old_status}"] -= 1
+                inc[f"by_status.{new_status}"] += 1
+                inc[f"by_type_status.{item_type}.{old_status}"] -= 1
+                inc[f"by_type_status.{item_type}.{new_status}"] += 1
+        if increments:
+            await self._write(db, increments)
+
+    async def _write(self, db, increments):
+        # Every write also bumps the scope's version, which tells reconcile it moved.
+        await self._coll(db).bulk_write(
+            [UpdateOne({"_id": scope}, {"$inc": {**inc, VERSION_FIELD: 1}}, upsert=True)
+             for scope, inc in increments.items()],
+            ordered=False,
+        )
+
+    async def get(self, db, scope):
+        doc = await self._coll(db).find_one({"_id": scope})
+        result = {"scope": scope, "total": 0, **{dim: {} for dim in DIMENSIONS}}
+        if doc:
+            doc.pop("_id")
+            doc.pop(VERSION_FIELD, None)
+            result.update(doc)
+        return result
+
+    async def reconcile(self, db):
+        """Recompute all counters from the source collections and correct the stored ones.
+
+        The stored counters are read first as a high-water mark, one scope document at a
+        time, then ``started_at`` is taken and the aggregation counts only rows created
+        before it; rows whose status changed after it are counted under
+        ``previous_status``, the state the mark saw. The correction is applied as
+        ``$inc`` of (recomputed - mark).
+
+        A write that lands between reading a scope's mark and ``started_at`` would be
+        counted by both the aggregation and its own ``$inc``. Every write bumps the
+        scope's version, so the versions are read again after ``started_at`` and any
+        scope that moved is left for the next run. The global scope is read last and
+        first, keeping its window short enough for it to be corrected on a busy site.
+        Only an item stored before ``started_at`` whose ``$inc`` lands after the second
+        read can still leave a counter off until the next run.
+        """
+        marks, versions = {}, {}
+        # _id descending reads every user scope before "global".
+        async for doc in self._coll(db).find({"_id": {"$ne": LEASE_ID}}).sort("_id", -1):
+            scope = doc.pop("_id")
+            doc.pop("reconciled_at", None)
+            versions[scope] = doc.pop(VERSION_FIELD, 0)
+            marks[scope] = _flatten(doc)
+        started_at = datetime.now(timezone.utc)
+        moved = set()
+        async for doc in self._coll(db).find({"_id": {"$ne": LEASE_ID}}, {VERSION_FIELD: 1}).sort("_id", 1):
+            if doc.get(VERSION_FIELD, 0) != versions.get(doc["_id"], 0):
+                moved.add(doc["_id"])
+
+        totals = defaultdict(lambda: defaultdict(int))
+        pipeline = [
+            {"$match": {"created_at": {"$lt": started_at}}},
+            {"$group": {
+                "_id": {
+                    "user_id": "$user_id", "type": "$type", "category": "$category",
+                    "status": {"$cond": [{"$gte": ["$status_changed_at", started_at]}, "$previous_status", "$status"]},
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                },
+                "count": {"$sum": 1},
+            }},
+        ]
+        for source in self.sources:
+            async for row in db[source].aggregate(pipeline, allowDiskUse=True):
+                key, count = row["_id"], row["count"]
+                counters = item_counters(key, status=key.get("status"), day=key.get("day") or "unknown")
+                for scope in (GLOBAL_SCOPE, user_scope(key.get("user_id"))):
+                    totals[scope]["total"] += count
+                    for field in counters:
+                        totals[scope][field] += count
+
+        now = datetime.now(timezone.utc)
+        ops, corrected = [], 0
+        for scope in (set(totals) | set(marks)) - moved:
+            flat, mark = totals.get(scope, {}), marks.get(scope, {})
+            diff = {field: flat.get(field, 0) - mark.get(field, 0) for field in set(flat) | set(mark)}
+            diff = {field: value for field, value in diff.items() if value}
+            update = {"$set": {"reconciled_at": now}}
+            if diff:
+                update["$inc"] = diff
+                corrected += 1
+            ops.append(UpdateOne({"_id": scope}, update, upsert=True))
+        if ops:
+            await self._coll(db).bulk_write(ops, ordered=False)
+        # Scopes with nothing left; a concurrent create makes the total non-zero and keeps the doc.
+        await self._coll(db).delete_many({"_id": {"$nin": list(totals) + [LEASE_ID]}, "total": {"$lte": 0}})
+        self.last_reconciled_at = now
+        logger.info("Reconciled item stats for %d scopes (%d corrected, %d written meanwhile and skipped)",
+                    len(totals), corrected, len(moved))
+
+    async def claim(self, db, now):
+        """Take this interval's reconciliation; False when another worker already has it."""
+        try:
+            await self._coll(db).update_one(
+                {"_id": LEASE_ID, "next_run_at": {"$lte": now}},
+                {"$set": {"next_run_at": now + timedelta(seconds=self.reconcile_seconds)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False   # the lease exists and is not due yet
+        return True
+
+    def start(self, db):
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db):
+        while True:
+            try:
+                if await self.claim(db, datetime.now(timezone.utc)):
+                    await self.reconcile(db)
+            except Exception:
+                logger.exception("Item stats reconciliation failed")
+            await asyncio.sleep(self.reconcile_seconds)
+
+
+def _flatten(doc, prefix=""):
+    flat = {}
+    for key, value in doc.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[prefix + key] = value
+    return flat
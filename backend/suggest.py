@@ -0,0 +1,171 @@
+import heapq
+from itertools import count
+
+from search_index import TOKEN_RE, TrigramIndex
+
+SUGGEST_FIELDS = ("title", "category", "location")
+
+# Suggestions can start at any word of a phrase; longer phrases are cut to bound the trie.
+MAX_PHRASE_WORDS = 8
+
+
+def phrase_words(text):
+    return TOKEN_RE.findall(text.lower())[:MAX_PHRASE_WORDS] if text else []
+
+
+class _Node:
+    __slots__ = ("children", "keys", "best")
+
+    def __init__(self):
+        self.children = {}
+        self.keys = set()   # (field, phrase) entries ending here
+        self.best = 0       # highest phrase count anywhere in this subtree
+
+
+class SuggestIndex:
+    """Prefix trie over the titles, categories and locations of active items.
+
+    Every phrase is inserted once per word position, so "pho" completes "Black iPhone"
+    as well as "Phone case". Each node tracks the most popular phrase below it, which
+    lets a lookup walk best-first and stop after ``limit`` results however short the prefix.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.phrases = {}        # (field, phrase) -> [display text, active item count]
+        self.item_keys = {}      # item_id -> (field, phrase) keys, needed for removal
+        self.word_counts = {}    # word -> distinct phrases using it
+        self.words = TrigramIndex()
+
+    def __len__(self):
+        return len(self.item_keys)
+
+    def add(self, item):
+        item_id = item["id"]
+        if item_id in self.item_keys:
+            self.remove(item_id)
+        keys = []
+        for field in SUGGEST_FIELDS:
+            text = item.get(field)
+            words = phrase_words(text)
+            if not words:
+                continue
+            key = (field, " ".join(words))
+            entry = self.phrases.get(key)
+            if entry is None:
+                entry = self.phrases[key] = [" ".join(text.split()), 0]
+                for word in set(words):
+                    if word not in self.word_counts:
+                        self.words.add(word)
+                    self.word_counts[word] = self.word_counts.get(word, 0) + 1
+            entry[1] += 1
+            keys.append(key)
+            self._update(key, words, grew=True)
+        self.item_keys[item_id] = tuple(keys)
+
+    def remove(self, item_id):
+        for key in self.item_keys.pop(item_id, ()):
+            entry = self.phrases[key]
+            entry[1] -= 1
+            words = key[1].split(" ")
+            if not entry[1]:
+                del self.phrases[key]
+                for word in set(words):
+                    self.word_counts[word] -= 1
+                    if not self.word_counts[word]:
+                        del self.word_counts[word]
+                        self.words.discard(word)
+            self._update(key, words, grew=False)
+
+    def clear(self):
+        self.root = _Node()
+        self.phrases.clear()
+        self.item_keys.clear()
+        self.word_counts.clear()
+        self.words.clear()
+
+    def _update(self, key, words, grew):
+        """Re-file ``key`` under each of its suffixes and refresh ``best`` along those paths."""
+        entry = self.phrases.get(key)
+        paths = []
+        for start in range(len(words)):
+            suffix = " ".join(words[start:])
+            path = [self.root]
+            for char in suffix:
+                node = path[-1].children.get(char)
+                if node is None:
+                    if entry is None:
+                        break
+                    node = path[-1].children[char] = _Node()
+                path.append(node)
+            else:
+                if entry is None:
+                    path[-1].keys.discard(key)
+                else:
+                    path[-1].keys.add(key)
+                paths.append((path, suffix))
+        # One suffix can end inside another's path ("1" in "12 row 1"), so the key must be
+        # gone from every terminal before any ``best`` is recomputed.
+        for path, suffix in paths:
+            if grew:
+                self._raise(path, entry[1])
+            else:
+                self._lower(path, suffix)
+
+    def _raise(self, path, hits):
+        for node in reversed(path):
+            if node.best >= hits:
+                break
+            node.best = hits
+
+    def _lower(self, path, suffix):
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            best = max((self.phrases[key][1] for key in node.keys), default=0)
+            for child in node.children.values():
+                if child.best > best:
+                    best = child.best
+            if best == node.best:
+                break   # ancestors already reflect this subtree
+            node.best = best
+            if depth and not best:
+                # Nothing left below: unlink the node from its parent.
+                del path[depth - 1].children[suffix[depth - 1]]
+
+    def _complete(self, prefix, limit, seen, results):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return
+        tiebreak = count()
+        heap = [(-node.best, next(tiebreak), node)]
+        while heap and len(results) < limit:
+            _, _, value = heapq.heappop(heap)
+            if isinstance(value, _Node):
+                for key in value.keys:
+                    heapq.heappush(heap, (-self.phrases[key][1], next(tiebreak), key))
+                for child in value.children.values():
+                    heapq.heappush(heap, (-child.best, next(tiebreak), child))
+            elif value not in seen:
+                seen.add(value)
+                text, hits = self.phrases[value]
+                results.append({"text": text, "field": value[0], "count": hits})
+
+    def suggest(self, prefix, limit=10):
+        """Most popular phrases containing a word that starts with ``prefix``.
+
+        When nothing matches, the last word is treated as a typo and replaced by its
+        closest known spellings.
+        """
+        words = TOKEN_RE.findall(prefix.lower())
+        if not words:
+            return []
+        trailing = " " if prefix[-1:].isspace() else ""
+        seen, results = set(), []
+        self._complete(" ".join(words) + trailing, limit, seen, results)
+        if not results:
+            corrections = self.words.similar(words[-1], limit=3, popularity=self.word_counts.get)
+            for word, _ in corrections:
+                self._complete(" ".join(words[:-1] + [word]) + trailing, limit, seen, results)
+        return results
@@ -212,6 +212,18 @@ class FoundLossAPITester:
         """Test getting items by category"""
         return self.run_test("Get Items by Category", "GET", "items?category=Electronics", 200)
 
+    def test_search_items(self):
+        """Test full-text search over items"""
+        success, response = self.run_test("Search Items", "GET", "items/search?q=iphone", 200)
+        if success and 'total' not in response:
+            self.log_result("Search Items Shape", False, "", "Response missing 'total'")
+            return False, response
+        return success, response
+
+    def test_nearby_items(self):
+        """Test geospatial nearby query"""
+        return self.run_test("Nearby Items", "GET", "items/nearby?lat=40.7128&lng=-74.0060&radius_km=10", 200)
+
     def test_get_specific_item(self):
         """Test getting a specific item by ID"""
         if not self.created_items:
@@ -221,6 +233,36 @@ class FoundLossAPITester:
         item_id = self.created_items[0]
         return self.run_test("Get Specific Item", "GET", f"items/{item_id}", 200)
 
+    def test_item_matches(self):
+        """Test lost/found match candidates for an item"""
+        if not self.created_items:
+            self.log_result("Item Matches", False, "", "No items created to test with")
+            return False, {}
+        
+        item_id = self.created_items[0]
+        return self.run_test("Item Matches", "GET", f"items/{item_id}/matches", 200)
+
+    def test_batch_items(self):
+        """Test fetching several items by id in one request"""
+        if not self.created_items:
+            self.log_result("Batch Items", False, "", "No items created to test with")
+            return False, {}
+        
+        batch_data = {"ids": self.created_items + ["missing-item-id"]}
+        return self.run_test("Batch Items", "POST", "items/batch", 200, batch_data)
+
+    def test_saved_search(self):
+        """Test saving a search and listing alerts"""
+        if not self.token:
+            self.log_result("Saved Search", False, "", "No authentication token available")
+            return False, {}
+        
+        search_data = {"type": "found", "category": "Electronics", "keywords": "iphone"}
+        success, _ = self.run_test("Saved Search", "POST", "saved-searches", 200, search_data)
+        if not success:
+            return False, {}
+        return self.run_test("Get Alerts", "GET", "alerts", 200)
+
     def test_get_my_items(self):
         """Test getting current user's items"""
         if not self.token:
@@ -294,7 +336,12 @@ class FoundLossAPITester:
         self.test_get_found_items()
         self.test_get_lost_items()
         self.test_get_items_by_category()
+        self.test_search_items()
+        self.test_nearby_items()
         self.test_get_specific_item()
+        self.test_item_matches()
+        self.test_batch_items()
+        self.test_saved_search()
         self.test_get_my_items()
         
         # Interaction tests
@@ -24,6 +24,8 @@ const BrowseFound = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('all');
   const [filteredItems, setFilteredItems] = useState([]);
+  const [searchResults, setSearchResults] = useState(null);
+  const [suggestions, setSuggestions] = useState([]);
 
   const categories = [
     'all', 'Electronics', 'Jewelry', 'Clothing', 'Bags & Wallets', 'Keys', 
@@ -35,9 +37,38 @@ const BrowseFound = () => {
     fetchFoundItems();
   }, []);
 
+  useEffect(() => {
+    const query = searchTerm.trim();
+    if (!query) {
+      setSearchResults(null);
+      setSuggestions([]);
+      return;
+    }
+    // Debounced server-side search: typo tolerant and not limited to the first page of items.
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const [results, hints] = await Promise.all([
+          axios.get(`${API_URL}/items/search`, { params: { q: query, type: 'found', limit: 50 } }),
+          axios.get(`${API_URL}/items/suggest`, { params: { prefix: searchTerm } })
+        ]);
+        if (!cancelled) {
+          setSearchResults(results.data.items);
+          setSuggestions(hints.data);
+        }
+      } catch (error) {
+        console.error('Error searching found items:', error);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm]);
+
   useEffect(() => {
     filterItems();
-  }, [items, searchTerm, selectedCategory]);
+  }, [items, searchResults, selectedCategory]);
 
   const fetchFoundItems = async () => {
     try {
@@ -52,15 +83,7 @@ const BrowseFound = () => {
   };
 
   const filterItems = () => {
-    let filtered = items;
-    
-    if (searchTerm) {
-      filtered = filtered.filter(item => 
-        item.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        item.description.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        item.location.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-    }
+    let filtered = searchResults ?? items;
     
     if (selectedCategory && selectedCategory !== 'all') {
       filtered = filtered.filter(item => item.category === selectedCategory);
@@ -156,7 +179,13 @@ const BrowseFound = () => {
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
               className="form-input"
+              list="found-suggestions"
             />
+            <datalist id="found-suggestions">
+              {suggestions.map((suggestion) => (
+                <option key={`${suggestion.field}:${suggestion.text}`} value={suggestion.text} />
+              ))}
+            </datalist>
           </div>
           <div>
             <Select value={selectedCategory} onValueChange={setSelectedCategory}>
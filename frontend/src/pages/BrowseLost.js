@@ -25,6 +25,8 @@ const BrowseLost = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('all');
   const [filteredItems, setFilteredItems] = useState([]);
+  const [searchResults, setSearchResults] = useState(null);
+  const [suggestions, setSuggestions] = useState([]);
 
   const categories = [
     'all', 'Electronics', 'Jewelry', 'Clothing', 'Bags & Wallets', 'Keys', 
@@ -36,9 +38,38 @@ const BrowseLost = () => {
     fetchLostItems();
   }, []);
 
+  useEffect(() => {
+    const query = searchTerm.trim();
+    if (!query) {
+      setSearchResults(null);
+      setSuggestions([]);
+      return;
+    }
+    // Debounced server-side search: typo tolerant and not limited to the first page of items.
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const [results, hints] = await Promise.all([
+          axios.get(`${API_URL}/items/search`, { params: { q: query, type: 'lost', limit: 50 } }),
+          axios.get(`${API_URL}/items/suggest`, { params: { prefix: searchTerm } })
+        ]);
+        if (!cancelled) {
+          setSearchResults(results.data.items);
+          setSuggestions(hints.data);
+        }
+      } catch (error) {
+        console.error('Error searching lost items:', error);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm]);
+
   useEffect(() => {
     filterItems();
-  }, [items, searchTerm, selectedCategory]);
+  }, [items, searchResults, selectedCategory]);
 
   const fetchLostItems = async () => {
     try {
@@ -53,15 +84,7 @@ const BrowseLost = () => {
   };
 
   const filterItems = () => {
-    let filtered = items;
-    
-    if (searchTerm) {
-      filtered = filtered.filter(item => 
-        item.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        item.description.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        item.location.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-    }
+    let filtered = searchResults ?? items;
     
     if (selectedCategory && selectedCategory !== 'all') {
       filtered = filtered.filter(item => item.category === selectedCategory);
@@ -170,7 +193,13 @@ const BrowseLost = () => {
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
               className="form-input"
+              list="lost-suggestions"
             />
+            <datalist id="lost-suggestions">
+              {suggestions.map((suggestion) => (
+                <option key={`${suggestion.field}:${suggestion.text}`} value={suggestion.text} />
+              ))}
+            </datalist>
           </div>
           <div>
             <Select value={selectedCategory} onValueChange={setSelectedCategory}>
@@ -39,20 +39,23 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      // Fetch all items for stats
-      const [allItemsRes, myItemsRes] = await Promise.all([
+      // Counts come from the server-side counters; the lists only feed the recent panels
+      const [allItemsRes, myItemsRes, statsRes, myStatsRes] = await Promise.all([
         axios.get(`${API_URL}/items?limit=10`),
-        axios.get(`${API_URL}/my-items`)
+        axios.get(`${API_URL}/my-items`),
+        axios.get(`${API_URL}/stats`),
+        axios.get(`${API_URL}/stats/me`)
       ]);
 
       const allItems = allItemsRes.data;
       const myItems = myItemsRes.data;
+      const activeByType = statsRes.data.by_type_status || {};
 
       setStats({
-        totalItems: allItems.length,
-        foundItems: allItems.filter(item => item.type === 'found').length,
-        lostItems: allItems.filter(item => item.type === 'lost').length,
-        myItems: myItems.length
+        totalItems: statsRes.data.by_status?.active || 0,
+        foundItems: activeByType.found?.active || 0,
+        lostItems: activeByType.lost?.active || 0,
+        myItems: myStatsRes.data.total || 0
       });
 
       setRecentItems(allItems.slice(0, 6));
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
@@ -33,11 +33,17 @@ const ItemDetails = () => {
   const [message, setMessage] = useState('');
   const [isContactDialogOpen, setIsContactDialogOpen] = useState(false);
   const [contacting, setContacting] = useState(false);
+  // Reused until a send succeeds, so a retried request is delivered only once
+  const contactKey = useRef(null);
 
   useEffect(() => {
     fetchItemDetails();
   }, [id]);
 
+  useEffect(() => {
+    contactKey.current = null;
+  }, [message, contactMethod]);
+
   const fetchItemDetails = async () => {
     try {
       const response = await axios.get(`${API_URL}/items/${id}`);
@@ -70,13 +76,17 @@ const ItemDetails = () => {
 
     setContacting(true);
     try {
+      contactKey.current = contactKey.current || crypto.randomUUID();
       const response = await axios.post(`${API_URL}/contact-owner`, {
         item_id: item.id,
         contact_method: contactMethod,
         message: message
+      }, {
+        headers: { 'Idempotency-Key': contactKey.current }
       });
 
       if (response.data.success) {
+        contactKey.current = null;
         const contactInfo = response.data.contact_info;
         
         // Handle different contact methods
@@ -0,0 +1,136 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from cache import ResponseCache  # noqa: E402
+
+
+def test_concurrent_misses_share_one_loader_call():
+    async def scenario():
+        cache, calls, release = ResponseCache(), [], asyncio.Event()
+
+        async def loader():
+            calls.append(1)
+            await release.wait()
+            return b"body"
+
+        waiters = [asyncio.create_task(cache.get_or_load("k", ["t"], loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        entries = await asyncio.gather(*waiters)
+        assert len(calls) == 1
+        assert all(entry is entries[0] for entry in entries)
+        assert cache.coalesced == 4
+        assert await cache.get_or_load("k", ["t"], loader) is entries[0]
+        assert len(calls) == 1
+        assert not cache._inflight
+
+    asyncio.run(scenario())
+
+
+def test_result_loaded_across_an_invalidation_is_not_stored():
+    async def scenario():
+        cache, release = ResponseCache(), asyncio.Event()
+
+        async def stale_loader():
+            await release.wait()
+            return b"old"
+
+        async def fresh_loader():
+            return b"new"
+
+        first = asyncio.create_task(cache.get_or_load("k", ["t"], stale_loader))
+        waiter = asyncio.create_task(cache.get_or_load("k", ["t"], stale_loader))
+        await asyncio.sleep(0)
+        cache.invalidate("unrelated")   # any invalidation may cover what the loader read
+        release.set()
+        # Callers already waiting still get the result...
+        assert (await first).body == (await waiter).body == b"old"
+        # ...but it was never cached, so the next read loads again.
+        assert (await cache.get_or_load("k", ["t"], fresh_loader)).body == b"new"
+        assert "k" not in cache.tags.get("unrelated", set())
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_drops_tagged_entries():
+    async def scenario():
+        cache = ResponseCache()
+
+        async def loader():
+            return b"body"
+
+        await cache.get_or_load("a", ["list:*:*", "item:1"], loader)
+        await cache.get_or_load("b", ["item:2"], loader)
+        cache.invalidate("item:1")
+        assert cache.entries.get("a") is None
+        assert cache.entries.get("b") is not None
+
+    asyncio.run(scenario())
+
+
+def test_loader_exception_reaches_every_waiter_and_is_not_cached():
+    async def scenario():
+        cache, release, calls = ResponseCache(), asyncio.Event(), []
+
+        async def failing():
+            calls.append(1)
+            await release.wait()
+            raise RuntimeError("db down")
+
+        waiters = [asyncio.create_task(cache.get_or_load("k", ["t"], failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert len(calls) == 1
+        assert all(isinstance(result, RuntimeError) and str(result) == "db down" for result in results)
+        assert not cache._inflight and cache.entries.get("k") is None
+
+        async def loader():
+            return b"ok"
+
+        assert (await cache.get_or_load("k", ["t"], loader)).body == b"ok"
+
+    asyncio.run(scenario())
+
+
+def test_tag_links_of_evicted_entries_are_pruned():
+    async def scenario():
+        cache = ResponseCache(maxsize=2)
+
+        async def loader():
+            return b"body"
+
+        # Pruning is amortised: links to evicted keys pile up to 4 * maxsize, then are swept.
+        for n in range(200):
+            await cache.get_or_load(f"k{n}", [f"item:{n}", "list:*:*"], loader)
+            assert sum(len(keys) for keys in cache.tags.values()) <= 4 * cache.entries.maxsize + 2
+        cache._prune_tags()
+        live = set(cache.entries._data)
+        assert live == {"k198", "k199"}
+        assert cache.tags == {"item:198": {"k198"}, "item:199": {"k199"}, "list:*:*": live}
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("tags", [[], ["t"]])
+def test_cancelled_loader_releases_the_key(tags):
+    async def scenario():
+        cache = ResponseCache()
+
+        async def slow():
+            await asyncio.sleep(10)
+            return b"never"
+
+        task = asyncio.create_task(cache.get_or_load("k", tags, slow))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not cache._inflight
+
+    asyncio.run(scenario())
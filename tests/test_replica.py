@@ -0,0 +1,157 @@
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from replica import ActiveReplica  # noqa: E402
+
+TYPES = ("lost", "found")
+CATEGORIES = ("Electronics", "Keys", "Bags")
+
+
+def make_items(rng, count):
+    base = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    # Few distinct instants, with sub-millisecond parts Mongo drops, so many items tie.
+    instants = [base + timedelta(milliseconds=rng.randrange(50), microseconds=rng.randrange(1000)) for _ in range(20)]
+    return [
+        {
+            "id": f"{rng.randrange(10 ** 6):06d}-{n}",
+            "type": rng.choice(TYPES),
+            "category": rng.choice(CATEGORIES),
+            "title": f"item {n}",
+            "status": "active",
+            "created_at": rng.choice(instants),
+        }
+        for n in range(count)
+    ]
+
+
+def stored_ms(created_at):
+    # Mongo keeps milliseconds, truncating the rest.
+    return int(created_at.timestamp()) * 1000 + created_at.microsecond // 1000
+
+
+def brute_force(items, type=None, category=None):
+    """The listing as Mongo returns it: newest first on (created_at, id)."""
+    matching = [item for item in items
+                if (type is None or item["type"] == type) and (category is None or item["category"] == category)]
+    return sorted(matching, key=lambda item: (stored_ms(item["created_at"]), item["id"]), reverse=True)
+
+
+def ids(docs):
+    return [doc["id"] for doc in docs]
+
+
+@pytest.fixture
+def replica_and_items():
+    rng = random.Random(11)
+    items = make_items(rng, 400)
+    replica = ActiveReplica()
+    for item in items:
+        replica.add(item)
+    # Churn so the sorted lists are exercised by removals as well as inserts.
+    for item in rng.sample(items, 80):
+        replica.remove(item["id"])
+        items.remove(item)
+    return replica, items
+
+
+FILTERS = [(None, None), ("lost", None), (None, "Keys"), ("found", "Bags")]
+
+
+@pytest.mark.parametrize("type,category", FILTERS)
+def test_page_matches_sorted_brute_force(replica_and_items, type, category):
+    replica, items = replica_and_items
+    expected = ids(brute_force(items, type, category))
+    for skip in (0, 1, 7, 50, len(expected) - 1, len(expected), len(expected) + 5):
+        for limit in (1, 10, 50):
+            assert ids(replica.page(type, category, skip, limit)) == expected[skip:skip + limit]
+
+
+@pytest.mark.parametrize("type,category", FILTERS)
+def test_cursor_round_trip_walks_the_whole_listing(replica_and_items, type, category):
+    server = pytest.importorskip("server")
+    replica, items = replica_and_items
+    expected = ids(brute_force(items, type, category))
+    walked, before = [], None
+    while True:
+        docs = replica.page(type, category, 0, 7 + 1, before=before)
+        walked += ids(docs[:7])
+        if len(docs) <= 7:
+            break
+        last = docs[6]
+        created_at, last_id = server.decode_cursor(server.encode_cursor(last))
+        before = server.cursor_key(created_at, last_id)
+        assert before == (stored_ms(last["created_at"].replace(tzinfo=timezone.utc)), last["id"])
+        # The Mongo path's $or on the decoded cursor selects exactly what the replica has left.
+        rest = [item for item in brute_force(items, type, category)
+                if stored_ms(item["created_at"]) < stored_ms(created_at)
+                or (stored_ms(item["created_at"]) == stored_ms(created_at) and item["id"] < last_id)]
+        assert ids(rest) == ids(replica.page(type, category, 0, len(items), before=before))
+    assert walked == expected
+
+
+def test_records_read_back_like_mongo():
+    replica = ActiveReplica()
+    created_at = datetime(2024, 5, 1, 12, 0, 0, 123999, tzinfo=timezone.utc)
+    replica.add({"id": "a", "type": "lost", "category": "Keys", "created_at": created_at})
+    doc = replica.get("a")
+    assert doc["created_at"] == datetime(2024, 5, 1, 12, 0, 0, 123000)
+    assert doc["status"] == "active" and doc["view_count"] == 0
+
+
+class FakeItems:
+    """Just enough of a Motor collection for resync and refresh."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        if "$or" in query:
+            since = query["$or"][0]["created_at"]["$gte"]
+            docs = [doc for doc in self.docs
+                    if doc["created_at"] >= since or doc.get("status_changed_at", since - timedelta(1)) >= since]
+        else:
+            docs = [doc for doc in self.docs if doc["status"] == query["status"]]
+        return FakeCursor([dict(doc) for doc in docs])
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+    async def to_list(self, length):
+        return self.docs
+
+
+def test_refresh_applies_other_workers_writes():
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=3)
+    docs = [{"id": str(n), "type": "lost", "category": "Keys", "status": "active", "created_at": old} for n in range(5)]
+    db = type("FakeDb", (), {"items": FakeItems(docs)})()
+    replica = ActiveReplica()
+
+    async def scenario():
+        await replica.resync(db, {})
+        # Another worker resolves one item and posts a new one.
+        docs[0].update(status="resolved", status_changed_at=datetime.now(timezone.utc))
+        docs.append({"id": "new", "type": "found", "category": "Bags", "status": "active",
+                     "created_at": datetime.now(timezone.utc)})
+        assert await replica.refresh(db, {}) == 2
+
+    asyncio.run(scenario())
+    assert replica.get("0") is None
+    assert replica.get("new") is not None
+    assert ids(replica.page()) == ["new", "4", "3", "2", "1"]
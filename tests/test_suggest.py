@@ -0,0 +1,69 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from suggest import SuggestIndex, phrase_words  # noqa: E402
+
+WORDS = ["1", "12", "123", "row", "gate", "gat", "g", "black", "bl", "iphone", "i"]
+FIELDS = ("title", "category", "location")
+
+
+def brute_force(items, prefix, limit):
+    counts = {}
+    for item in items.values():
+        for field in FIELDS:
+            words = phrase_words(item.get(field))
+            if not words:
+                continue
+            key = (field, " ".join(words))
+            counts[key] = counts.get(key, 0) + 1
+    matches = {key: n for key, n in counts.items()
+               if any(" ".join(key[1].split(" ")[i:]).startswith(prefix) for i in range(len(key[1].split(" "))))}
+    return matches, sorted(matches.values(), reverse=True)[:limit]
+
+
+def check_invariants(index, node):
+    best = max([index.phrases[key][1] for key in node.keys] + [check_invariants(index, c) for c in node.children.values()] + [0])
+    assert best == node.best
+    assert best or node is index.root
+    return best
+
+
+def test_random_add_remove_matches_brute_force():
+    rng = random.Random(7)
+    index, items = SuggestIndex(), {}
+    for step in range(4000):
+        if items and rng.random() < 0.45:
+            item_id = rng.choice(list(items))
+            del items[item_id]
+            index.remove(item_id)
+        else:
+            item_id = str(rng.randrange(300))
+            items[item_id] = {
+                "id": item_id,
+                **{field: " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) for field in FIELDS},
+            }
+            index.add(items[item_id])
+
+        if step % 50 == 0:
+            check_invariants(index, index.root)
+            for prefix in ("1", "12", "g", "gat", "bl", "i", "row 1", "zz"):
+                matches, top_counts = brute_force(items, prefix, 5)
+                results = index.suggest(prefix, limit=5)
+                if not matches:
+                    continue   # the typo fallback may answer with corrected spellings
+                assert [r["count"] for r in results] == top_counts
+                assert all(matches[(r["field"], " ".join(phrase_words(r["text"])))] == r["count"] for r in results)
+
+    for item_id in list(items):
+        index.remove(item_id)
+    assert not index.root.children and not index.phrases and not index.word_counts
+
+
+def test_remove_phrase_whose_suffix_prefixes_another():
+    index = SuggestIndex()
+    index.add({"id": "a", "location": "Gate 12 Row 1"})
+    index.remove("a")
+    assert not index.root.children